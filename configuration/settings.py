@@ -24,6 +24,32 @@ LOG_FILE = LOG_DIR / "scoreboard.log"
 DB_FILE = DATA_DIR / "scoreboard.db"
 MESSAGE_PRESETS_FILE = DATA_DIR / "message_presets.json"
 
+# Log retention per LogType; older or excess entries are pruned in the background
+LOG_RETENTION = {
+    "game": {"max_age_days": 365, "max_rows": 200000},
+    "system": {"max_age_days": 90, "max_rows": 50000},
+    "error": {"max_age_days": 180, "max_rows": 50000},
+    "power": {"max_age_days": 30, "max_rows": 50000},
+    "network": {"max_age_days": 7, "max_rows": 50000},
+}
+
+# Days of event counts kept per rollup bucket width (None keeps them forever)
+LOG_ROLLUP_RETENTION = {"minute": 7, "hour": 180, "day": None}
+
+# Newest entries per log type kept in memory for the logs page (0 disables)
+LOG_BUFFER_SIZE = 1000
+
+# Repeats of an event within window seconds are merged into one row with a
+# count; "key" lists the detail fields that must match (omit to match them
+# all) and "sample" is the fraction of entries kept before merging
+LOG_COALESCE = {
+    "low_voltage_warning": {"window": 300, "key": []},
+    "low_battery_warning": {"window": 600, "key": []},
+    "power_input_missing": {"window": 600},
+    "http_request": {"window": 60},
+    "render_frame_failed": {"window": 60},
+}
+
 # Display configuration
 DISPLAY_CONFIG = {
     "rows": 32,
@@ -36,6 +62,91 @@ DISPLAY_CONFIG = {
     "pwm_lsb_nanoseconds": 130,
 }
 
+# Zones on the combined display. Box values are pixels (int), pixels from the
+# far edge (negative int) or a fraction of the display (float); anchor shifts
+# the box by a fraction of its own size. Score zones need at least 32x32 pixels,
+# so they are sized in pixels and the center takes whatever is left.
+DISPLAY_LAYOUT = {
+    "home": {"content": "score", "team": "home", "box": (0, 0, 32, 1.0)},
+    "away": {"content": "score", "team": "away", "box": (1.0, 0, 32, 1.0), "anchor": (1.0, 0.0)},
+    "center": {"content": "center", "box": (32, 0, -64, -2)},
+    "status": {"content": "status", "box": (0.5, 1.0, 8, 2), "anchor": (0.5, 1.0)},
+}
+
+# Text font: a TrueType or .pil bitmap font (None for Pillow's default)
+FONT_CONFIG = {
+    "path": os.getenv("DISPLAY_FONT"),
+    "size": 10,
+    "max_glyphs": 256,  # Rasterized glyphs kept per font
+    "max_strings": 64,  # Rendered strings kept, e.g. clock faces and messages
+}
+
+# Matrix driver: "rgbmatrix" on the Pi, "virtual" for headless runs and CI
+MATRIX_BACKEND = {
+    "backend": os.getenv("MATRIX_BACKEND", "rgbmatrix"),
+    "capture_dir": os.getenv("MATRIX_CAPTURE_DIR"),  # Dump frames here when set
+    "capture_format": os.getenv("MATRIX_CAPTURE_FORMAT", "png"),  # "png" or "raw"
+}
+
+# Frame post-processing (per channel R, G, B). rgbmatrix already applies
+# CIE1931 correction, so gamma stays at 1.0 unless a panel needs trimming.
+# Brightness stays on matrix.brightness, which dims in PWM and keeps all 8 bits
+# of every channel; scaling pixels instead (SOFTWARE_BRIGHTNESS=true) leaves
+# only a few levels per channel when dim, and hues shift as they round off.
+COLOR_CORRECTION = {
+    "software_brightness": os.getenv("SOFTWARE_BRIGHTNESS", "False").lower() == "true",
+    "brightness_curve": 1.0,  # Exponent mapping brightness percent to level
+    "gamma": (1.0, 1.0, 1.0),
+    "calibration": (1.0, 1.0, 1.0),  # Per-channel gain to match panel batches
+}
+
+# Display loop pacing
+FRAME_SCHEDULER = {
+    "active_fps": 30,  # While scrolling or animating
+    "idle_interval": 5.0,  # Longest sleep between frames, in seconds
+    "stats_window": 200,  # Frames kept for fps/jitter statistics
+}
+
+# Precomputed animations, played back in place of the normal board
+ANIMATION_CONFIG = {
+    "fps": 30,
+    "cache_bytes": 8 * 1024 * 1024,  # Frames kept across all animations
+    "durations": {  # Seconds
+        "goal": 2.0,
+        "period_end": 1.5,
+        "transition": 2.0,
+    },
+}
+
+# Renderer process (RENDER_PROCESS=true moves frame work off the web server)
+RENDER_PROCESS = {
+    "enabled": os.getenv("RENDER_PROCESS", "False").lower() == "true",
+    "supervisor": {
+        "restart_delay": 1.0,  # Seconds before restarting a dead renderer
+        "stats_interval": 1.0,  # Seconds between frame stats reports
+        "hang_timeout": 15.0,  # Restart when no stats arrive for this long
+    },
+}
+
+# Game state snapshots for recovery after a power loss; on boot the board
+# restores the last snapshot and replays the GAME events logged after it
+RECOVERY = {
+    "snapshot_file": DATA_DIR / "game_state.json",
+    "interval": 5.0,  # Seconds between snapshots while the game state changes
+}
+
+# Server-sent state stream for controllers (/api/status/stream)
+STATUS_STREAM = {
+    "heartbeat": 15.0,  # Seconds between keep-alive comments on an idle stream
+    "retry_ms": 2000,  # Browser reconnect delay after a dropped connection
+}
+
+# ETag responses for /api/status and the log queries
+CONDITIONAL_GET = {
+    "readings_ttl": 5.0,  # Seconds display, power and system readings are reused
+    "max_bodies": 64,  # Serialized responses kept, one per distinct URL
+}
+
 # Network configuration
 NETWORK_CONFIG = {"ssid": "Hockey-Scoreboard", "port": 80, "host": "0.0.0.0"}
 
@@ -3,43 +3,84 @@ let timerInterval = null;
 let displayEnabled = true;
 let currentMode = 'timer';
 let timerRunning = false;
+let twoMinWarning = false;
+
+// Clock as last reported by the server, counted down locally between updates
+let clockRemaining = 0;
+let clockReceivedAt = 0;
 
 // Initialize when document loads
 document.addEventListener('DOMContentLoaded', () => {
     updateStatus();
     loadPresets();
-    // Update status every 2 seconds
-    setInterval(updateStatus, 2000);
+    if (window.EventSource) {
+        // Board state is pushed on every change; power and system readings
+        // change slowly, so the full status is only fetched occasionally
+        connectStateStream();
+        setInterval(updateStatus, 30000);
+        setInterval(tickTimerDisplay, 250);
+    } else {
+        setInterval(updateStatus, 2000);
+    }
 });
 
+// State Stream
+function connectStateStream() {
+    // EventSource reconnects by itself; the server resends the full state each time
+    const source = new EventSource('/api/status/stream');
+    source.addEventListener('state', event => applyState(JSON.parse(event.data)));
+    source.addEventListener('delta', event => applyState(JSON.parse(event.data)));
+    source.onerror = () => console.error('State stream interrupted, reconnecting');
+}
+
+// Apply a full state or a delta holding only the fields that changed
+function applyState(data) {
+    if (data.scores) {
+        document.getElementById('homeScore').textContent = data.scores.home;
+        document.getElementById('awayScore').textContent = data.scores.away;
+    }
+    if (data.clock) {
+        clockRemaining = data.clock.remaining;
+        clockReceivedAt = performance.now();
+        timerRunning = data.clock.running;
+        updateTimerDisplay(clockRemaining);
+        updateTimerButtons();
+    }
+    if (data.display_mode !== undefined) {
+        updateDisplayMode(data.display_mode);
+    }
+    if (data.display_enabled !== undefined) {
+        displayEnabled = data.display_enabled;
+        updateDisplayPower(data.display_enabled);
+    }
+    if (data.two_min_warning !== undefined && data.two_min_warning !== twoMinWarning) {
+        twoMinWarning = data.two_min_warning;
+        handleTwoMinWarning(twoMinWarning);
+    }
+}
+
+function tickTimerDisplay() {
+    if (timerRunning) {
+        const elapsed = (performance.now() - clockReceivedAt) / 1000;
+        updateTimerDisplay(Math.max(0, clockRemaining - elapsed));
+    }
+}
+
 // Status Updates
 async function updateStatus() {
     try {
         const response = await fetch('/api/status');
         const data = await response.json();
         
-        // Update scores
-        document.getElementById('homeScore').textContent = data.scores.home;
-        document.getElementById('awayScore').textContent = data.scores.away;
-        
-        // Update timer display
-        updateTimerDisplay(data.game_time);
+        // Update scores, timer, display mode and display power
+        applyState(data);
         
         // Update system status
         updateSystemStatus(data);
         
-        // Update display mode
-        updateDisplayMode(data.display_mode);
-        
         // Update power status
         updatePowerStatus(data.power);
         
-        // Update display power state
-        updateDisplayPower(data.display_enabled);
-        
-        timerRunning = !data.timer_paused;
-        updateTimerButtons();
-        
     } catch (error) {
         console.error('Status update failed:', error);
     }
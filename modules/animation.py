@@ -0,0 +1,153 @@
+# File: modules/animation.py
+
+import inspect
+from collections import OrderedDict
+from PIL import Image
+
+
+def goal_frames(layout, atlas, count, color, team):
+    """Scoring team's zone flashes while GOAL! blinks in the center"""
+    zone = next(zone for zone in layout.zones.values() if zone.team == team)
+    center = layout.zones[layout.center]
+    text = atlas.render("GOAL!", color)
+    frames = []
+    for index in range(count):
+        frame = Image.new("RGB", (layout.width, layout.height))
+        if (index // 4) % 2 == 0:
+            frame.paste(color, (zone.x, zone.y, zone.x + zone.width, zone.y + zone.height))
+        elif text:
+            text.paste(
+                frame,
+                center.x + (center.width - text.width) // 2,
+                center.y + (center.height - text.height) // 2
+            )
+        frames.append(frame)
+    return frames
+
+
+def sweep_frames(layout, atlas, count, color, width=16):
+    """Solid bar sweeping once across the whole display"""
+    frames = []
+    travel = layout.width + width
+    for index in range(count):
+        frame = Image.new("RGB", (layout.width, layout.height))
+        right = round(travel * (index + 1) / count)
+        frame.paste(color, (max(0, right - width), 0, min(layout.width, right), layout.height))
+        frames.append(frame)
+    return frames
+
+
+def transition_frames(layout, atlas, count, color, text=""):
+    """Message slides in from the right and settles in the center"""
+    center = layout.zones[layout.center]
+    bitmap = atlas.render(text, color)
+    frames = []
+    settle = max(1, count * 2 // 3)
+    for index in range(count):
+        frame = Image.new("RGB", (layout.width, layout.height))
+        if bitmap:
+            target = center.x + (center.width - bitmap.width) // 2
+            progress = min(1.0, index / settle)
+            x = round(layout.width + (target - layout.width) * progress)
+            bitmap.paste(frame, x, center.y + (center.height - bitmap.height) // 2)
+        frames.append(frame)
+    return frames
+
+
+ANIMATIONS = {
+    "goal": goal_frames,
+    "period_end": sweep_frames,
+    "transition": transition_frames,
+}
+
+
+def check_params(name, params):
+    """Raise ValueError unless params fit the named animation's frame function"""
+    if name not in ANIMATIONS:
+        raise ValueError(f"Unknown animation: {name}")
+    signature = inspect.signature(ANIMATIONS[name])
+    try:
+        # layout, atlas, count and color are supplied by the player
+        signature.bind(None, None, 1, (0, 0, 0), **params)
+    except TypeError as e:
+        raise ValueError(f"Bad parameters for {name}: {e}") from None
+    for key, value in params.items():
+        default = signature.parameters[key].default
+        expected = str if default is inspect.Parameter.empty else type(default)
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError(f"{name} parameter {key} must be {expected.__name__}")
+
+
+class AnimationCache:
+    """Precomputed frame sequences, evicting least recently used past max_bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        frames = self.entries.get(key)
+        if frames is not None:
+            self.entries.move_to_end(key)
+        return frames
+
+    def put(self, key, frames):
+        self.entries[key] = frames
+        self.size += self._size(frames)
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= self._size(evicted)
+        return frames
+
+    @staticmethod
+    def _size(frames):
+        return sum(frame.width * frame.height * len(frame.getbands()) for frame in frames)
+
+
+class AnimationPlayer:
+    """Builds animations into the cache and plays them back at a fixed frame rate"""
+
+    def __init__(self, layout, atlas, fps=30, durations=None, cache_bytes=8 * 1024 * 1024):
+        self.layout = layout
+        self.atlas = atlas
+        self.interval = 1.0 / fps
+        self.durations = durations or {}
+        self.cache = AnimationCache(cache_bytes)
+        self.frames = None
+        self.started = None
+
+    @property
+    def active(self):
+        return self.frames is not None
+
+    def build(self, name, color, params=()):
+        """Frames for an animation, rendered on first use"""
+        key = (name, tuple(color), params)
+        frames = self.cache.get(key)
+        if frames is None:
+            count = max(1, round(self.durations.get(name, 1.0) / self.interval))
+            frames = self.cache.put(key, tuple(
+                ANIMATIONS[name](self.layout, self.atlas, count, tuple(color), **dict(params))
+            ))
+        return frames
+
+    def start(self, name, color, params, now):
+        self.frames = self.build(name, color, params)
+        self.started = now
+
+    def stop(self):
+        self.frames = None
+
+    def frame(self, now):
+        """Frame due at now, or None once the animation has finished"""
+        index = int((now - self.started) / self.interval)
+        if index >= len(self.frames):
+            self.stop()
+            return None
+        return self.frames[index]
+
+    def next_delay(self, now):
+        """Seconds until the next frame is due"""
+        elapsed = now - self.started
+        return self.interval - elapsed % self.interval
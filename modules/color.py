@@ -0,0 +1,57 @@
+# File: modules/color.py
+
+import threading
+import numpy as np
+from PIL import Image
+
+# Offsets into the flattened (3 * 256) table for the R, G and B planes
+_CHANNEL_OFFSETS = np.array([0, 256, 512], dtype=np.uint16)
+_IDENTITY = np.tile(np.arange(256, dtype=np.uint8), (3, 1))
+
+
+class ColorCorrector:
+    """Per-channel gamma, calibration and software brightness applied as one LUT pass"""
+
+    def __init__(self, gamma=(1.0, 1.0, 1.0), calibration=(1.0, 1.0, 1.0), brightness_curve=2.0):
+        self.gamma = tuple(gamma)
+        self.calibration = tuple(calibration)
+        self.brightness_curve = brightness_curve
+        self.brightness = 100
+        self.lock = threading.Lock()
+        self.version = 0
+        self._rebuild()
+
+    def set_brightness(self, level):
+        """Change the software brightness (percent), rebuilding the LUT if needed"""
+        with self.lock:
+            if level != self.brightness:
+                self.brightness = level
+                self._rebuild()
+
+    def set_calibration(self, gamma=None, calibration=None):
+        """Change per-channel gamma and/or gain, rebuilding the LUT"""
+        with self.lock:
+            if gamma is not None:
+                self.gamma = tuple(gamma)
+            if calibration is not None:
+                self.calibration = tuple(calibration)
+            self._rebuild()
+
+    def _rebuild(self):
+        # Brightness scales perceptual levels before gamma so dim panels keep their hue
+        levels = np.arange(256) / 255.0 * (self.brightness / 100.0) ** self.brightness_curve
+        lut = np.empty((3, 256), dtype=np.uint8)
+        for channel in range(3):
+            curve = 255.0 * self.calibration[channel] * levels ** self.gamma[channel]
+            lut[channel] = np.clip(np.rint(curve), 0, 255)
+
+        # Published as one tuple so apply() never sees a half-built table
+        self.table = (lut.ravel(), np.array_equal(lut, _IDENTITY))
+        self.version += 1
+
+    def apply(self, image):
+        """Return image with the LUT applied to every pixel"""
+        lut, identity = self.table
+        if identity:
+            return image
+        return Image.fromarray(lut.take(np.asarray(image) + _CHANNEL_OFFSETS))
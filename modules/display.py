@@ -1,10 +1,26 @@
 # File: modules/display.py
 
-from rgbmatrix import RGBMatrix, RGBMatrixOptions
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+import numpy as np
 import threading
+import time
 from datetime import datetime
 from modules.logger import logger, LogType
+from modules.timer import GameTimer, clock_status
+from modules.state import BoardState, StateStore, freeze
+from modules.scheduler import FrameScheduler
+from modules.matrix import create_matrix
+from modules.profiling import StageProfiler
+from modules.color import ColorCorrector
+from modules.layout import Layout
+from modules.fonts import FontAtlas, MinuteStrings, load_font
+from modules.animation import AnimationPlayer, check_params
+from modules.render_process import RenderProcess
+from modules.recovery import GameSnapshotter, recover_game
+from configuration.settings import (
+    GAME_SETTINGS, FRAME_SCHEDULER, MATRIX_BACKEND, COLOR_CORRECTION, RENDER_PROCESS,
+    DISPLAY_CONFIG, DISPLAY_LAYOUT, FONT_CONFIG, ANIMATION_CONFIG, RECOVERY
+)
 
 class LargeDigits:
     def __init__(self):
@@ -77,7 +93,278 @@ class LargeDigits:
                 "XXXXXXXXX ",
                 "XXXXXXXXX "
             ],
-            # Add patterns for 2-9 similarly
+            '2': [
+                "  XXXXXX  ",
+                " XXXXXXXX ",
+                "XXXXXXXXXX",
+                "XXX    XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX"
+            ],
+            '3': [
+                "  XXXXXX  ",
+                " XXXXXXXX ",
+                "XXXXXXXXXX",
+                "XXX    XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "  XXXXXXXX",
+                "  XXXXXXXX",
+                "  XXXXXXXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "XXX    XXX",
+                "XXXXXXXXXX",
+                " XXXXXXXX ",
+                "  XXXXXX  "
+            ],
+            '4': [
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX"
+            ],
+            '5': [
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "XXX    XXX",
+                "XXXXXXXXXX",
+                " XXXXXXXX ",
+                "  XXXXXX  "
+            ],
+            '6': [
+                "  XXXXXX  ",
+                " XXXXXXXX ",
+                "XXXXXXXXXX",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXX       ",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXXXXXXXXX",
+                " XXXXXXXX ",
+                "  XXXXXX  "
+            ],
+            '7': [
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX"
+            ],
+            '8': [
+                "  XXXXXX  ",
+                " XXXXXXXX ",
+                "XXXXXXXXXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                " XXXXXXXX ",
+                "XXXXXXXXXX",
+                " XXXXXXXX ",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXXXXXXXXX",
+                " XXXXXXXX ",
+                "  XXXXXX  "
+            ],
+            '9': [
+                "  XXXXXX  ",
+                " XXXXXXXX ",
+                "XXXXXXXXXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXX    XXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "XXXXXXXXXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "       XXX",
+                "XXXXXXXXXX",
+                " XXXXXXXX ",
+                "  XXXXXX  "
+            ],
         }
         
         self.small_one = [
@@ -91,10 +378,8 @@ class LargeDigits:
             "XXXXXX"
         ]
 
-    def draw_digit(self, draw, digit, x_offset, y_offset, color, pixel_size=2):
-        """Draw a single large digit at specified position"""
-        pattern = self.digits[str(digit)]
-        
+    def draw_pattern(self, draw, pattern, x_offset, y_offset, color, pixel_size=1):
+        """Draw an ASCII pattern one rectangle per lit cell"""
         for y, row in enumerate(pattern):
             for x, cell in enumerate(row):
                 if cell == 'X':
@@ -108,93 +393,577 @@ class LargeDigits:
                         fill=color
                     )
 
-    def draw_small_one(self, draw, color):
+    def draw_digit(self, draw, digit, x_offset, y_offset, color, pixel_size=2):
+        """Draw a single large digit at specified position"""
+        self.draw_pattern(
+            draw, self.digits[str(digit)], x_offset, y_offset, color, pixel_size
+        )
+
+    def draw_small_one(self, draw, color, x_offset=24, y_offset=0):
         """Draw small "1" in top-right corner"""
-        pixel_size = 1
-        x_offset = 24
-        y_offset = 0
+        self.draw_pattern(draw, self.small_one, x_offset, y_offset, color)
+
+class GlyphCache:
+    """Pre-rasterized LargeDigits bitmaps keyed by (glyph, pixel_size, color)"""
+
+    SMALL_ONE = 'small_one'
+
+    def __init__(self, large_digits):
+        self.large_digits = large_digits
+        self.masks = {}
+        self.glyphs = {}
+        self.lock = threading.Lock()
+
+    def _build_mask(self, glyph, pixel_size):
+        """Rasterize a digit pattern once into an 'L' mask"""
+        if glyph == self.SMALL_ONE:
+            pattern = self.large_digits.small_one
+        else:
+            pattern = self.large_digits.digits[glyph]
+
+        width = max(len(row) for row in pattern) * pixel_size
+        height = len(pattern) * pixel_size
+        mask = Image.new('L', (width, height))
+        self.large_digits.draw_pattern(
+            ImageDraw.Draw(mask), pattern, 0, 0, 255, pixel_size
+        )
+        return mask
+
+    def get(self, glyph, pixel_size, color):
+        """Return the (image, mask) pair for a glyph, rasterizing on first use"""
+        key = (str(glyph), pixel_size, tuple(color))
+        entry = self.glyphs.get(key)
+        if entry is None:
+            with self.lock:
+                mask_key = key[:2]
+                mask = self.masks.get(mask_key)
+                if mask is None:
+                    mask = self.masks[mask_key] = self._build_mask(*mask_key)
+                entry = (Image.new('RGB', mask.size, key[2]), mask)
+                self.glyphs[key] = entry
+        return entry
+
+    def paste(self, image, glyph, x_offset, y_offset, color, pixel_size=2):
+        """Paste a cached glyph onto image in a single operation"""
+        glyph_image, mask = self.get(glyph, pixel_size, color)
+        image.paste(glyph_image, (x_offset, y_offset), mask)
+
+    def evict_color(self, color):
+        """Drop every cached glyph rendered in color"""
+        color = tuple(color)
+        with self.lock:
+            for key in [key for key in self.glyphs if key[2] == color]:
+                del self.glyphs[key]
+
+class DisplayZone:
+    """Cached sub-image for one region of the frame"""
+
+    def __init__(self, spec, render, stage):
+        self.spec = spec
+        self.name = spec.name
+        self.stage = stage
+        self.box = (spec.x, spec.y)
+        self.width = spec.width
+        self.height = spec.height
+        self.image = Image.new('RGB', (self.width, self.height))
+        self.draw = ImageDraw.Draw(self.image)
+        self.render = render
+        self.key = None
+        self.version = 0
+
+    def update(self, key, profiler):
+        """Re-render the zone if its inputs changed; return True when redrawn"""
+        if key == self.key:
+            return False
         
-        for y, row in enumerate(self.small_one):
-            for x, cell in enumerate(row):
-                if cell == 'X':
-                    draw.rectangle(
-                        [
-                            x_offset + (x * pixel_size),
-                            y_offset + (y * pixel_size),
-                            x_offset + (x * pixel_size) + pixel_size - 1,
-                            y_offset + (y * pixel_size) + pixel_size - 1
-                        ],
-                        fill=color
-                    )
+        with profiler.stage('allocation'):
+            self.image.paste((0, 0, 0), (0, 0, self.width, self.height))
+        with profiler.stage(self.stage):
+            self.render(self)
+        self.key = key
+        self.version += 1
+        return True
 
-class ScoreBoard:
-    def __init__(self):
-        # Initialize display options
-        self.options = RGBMatrixOptions()
-        self.options.rows = 32
-        self.options.cols = 64
-        self.options.chain_length = 4
-        self.options.parallel = 1
-        self.options.hardware_mapping = 'adafruit-hat'
-        self.options.gpio_slowdown = 2
-        self.options.pwm_bits = 11
-        self.options.pwm_lsb_nanoseconds = 130
-        
-        # Initialize matrix
-        self.matrix = RGBMatrix(options=self.options)
+class ScrollStrip:
+    """Message rendered once into a wide strip that a viewport slides across"""
+
+    def __init__(self, atlas, width, height):
+        self.atlas = atlas
+        self.width = width
+        self.height = height
+        self.key = None
+        self.image = None
+        self.period = 0
+        self.version = 0
+
+    def update(self, text, color):
+        """Re-render the strip if text or color changed; return True when rebuilt"""
+        key = (text, tuple(color))
+        if key == self.key:
+            return False
+        
+        self.key = key
+        self.version += 1
+        if not text:
+            self.image = None
+            self.period = 0
+            return True
+        
+        # A blank viewport-wide lead-in lets the message scroll fully off
+        # before it re-enters, and makes the wraparound seamless
+        bitmap = self.atlas.compose(text, key[1])
+        ink_width = bitmap.width if bitmap else 0
+        self.period = self.width + ink_width
+        self.image = Image.new('RGB', (self.period + self.width, self.height))
+        if bitmap:
+            bitmap.paste(self.image, self.width, (self.height - bitmap.height) // 2)
+        return True
+
+    def paste(self, image, offset):
+        """Blit the viewport starting at offset into image"""
+        if self.image is not None:
+            image.paste(self.image, (-offset, 0))
+
+class FrameRenderer:
+    """Turns BoardState snapshots into frames on the matrix"""
+
+    def __init__(self, options, matrix_backend, layout=DISPLAY_LAYOUT, frame_buffer=None,
+                 clock=time.monotonic, on_error=None):
+        # Initialize matrix (hardware or headless virtual backend)
+        self.matrix = create_matrix(options, **matrix_backend)
         self.double_buffer = self.matrix.CreateFrameCanvas()
+        self.clock = clock
         
-        # Game state
-        self.scores = {"home": 0, "away": 0}
-        self.game_time = 0
-        self.display_mode = 'timer'
-        self.scroll_text = ""
-        self.show_time = False
-        self.display_enabled = True
-        self.brightness = 100
-        self.timer_paused = False
-        self.two_min_warning = False
-        self.warning_triggered = False
-        
-        # Display settings
-        self.colors = {
-            'home': (0, 255, 0),
-            'away': (0, 255, 0),
-            'timer': (255, 255, 0),
-            'text': (0, 255, 255)
-        }
+        # Called as on_error(event, details); the render process passes its own
+        # so that it never opens the log database
+        self.on_error = on_error or (lambda event, details: logger.log(LogType.ERROR, event, details))
+        
+        # Zone and panel geometry, fixed for the life of the renderer
+        self.layout = Layout(options, layout)
+        
+        # Optional shared-memory copy of every pushed frame
+        self.frame_buffer = frame_buffer
         
         # Initialize components
         self.large_digits = LargeDigits()
+        self.glyph_cache = GlyphCache(self.large_digits)
+        self.font = load_font(FONT_CONFIG["path"], FONT_CONFIG["size"])
+        self.atlas = FontAtlas(
+            self.font, FONT_CONFIG["max_glyphs"], FONT_CONFIG["max_strings"]
+        )
+        self.minute_strings = MinuteStrings(self.atlas)
+        
+        # Persistent frame composed from independently cached zones
+        self.frame = Image.new('RGB', (self.layout.width, self.layout.height))
+        self.output = self.frame
+        self.frame_state = None
+        self.frame_game_time = 0.0
+        self.center_text = ''
+        self.scroll_offset = None
+        renderers = {
+            'score': (self._render_score_zone, 'digits'),
+            'center': (self._render_center_zone, 'text'),
+            'status': (self.draw_status_indicator, 'status'),
+        }
+        self.zones = {
+            name: DisplayZone(spec, *renderers[spec.content])
+            for name, spec in self.layout.zones.items()
+        }
+        self.center_zone = self.zones[self.layout.center]
+        self.scroll_position = 0
+        self.scroll_strip = ScrollStrip(
+            self.atlas, self.center_zone.width, self.center_zone.height
+        )
+        
+        # Tile keys of the last frame pushed and of the frame on the back canvas
+        self.pushed_key = None
+        self.canvas_keys = (None, None)
+        
+        # Precomputed animations and the id of the last request seen
+        self.player = AnimationPlayer(
+            self.layout, self.atlas,
+            fps=ANIMATION_CONFIG["fps"],
+            durations=ANIMATION_CONFIG["durations"],
+            cache_bytes=ANIMATION_CONFIG["cache_bytes"]
+        )
+        self.animation_seen = None
+        
+        # Gamma, calibration and software brightness applied to the whole frame
+        self.software_brightness = COLOR_CORRECTION["software_brightness"]
+        self.color_corrector = ColorCorrector(
+            gamma=COLOR_CORRECTION["gamma"],
+            calibration=COLOR_CORRECTION["calibration"],
+            brightness_curve=COLOR_CORRECTION["brightness_curve"]
+        )
+        self.brightness = None
+        self.colors = None
+        
+        # Frame pacing
+        self.scheduler = FrameScheduler(**FRAME_SCHEDULER)
+        
+        # Per-stage render timings, enabled by the benchmark suite
+        self.profiler = StageProfiler()
+
+    def _sync_output(self, state):
+        """Apply brightness and color changes carried by a new snapshot"""
+        if state.brightness != self.brightness:
+            self.brightness = state.brightness
+            if self.software_brightness:
+                self.color_corrector.set_brightness(state.brightness)
+            else:
+                self.matrix.brightness = state.brightness
+        
+        if state.colors is not self.colors:
+            if self.colors is not None:
+                in_use = set(state.colors.values())
+                for color in set(self.colors.values()) - in_use:
+                    self.glyph_cache.evict_color(color)
+            self.colors = state.colors
+
+    def _check_animation(self, state):
+        """Start an animation newly requested in the snapshot"""
+        request = state.animation
+        if self.frame_state is None:
+            # Prebuild goal celebrations, and never replay a request older than this renderer
+            for team in state.scores:
+                try:
+                    self.player.build('goal', state.colors[team], (('team', team),))
+                except Exception as e:
+                    self.on_error("animation_failed", {"name": "goal", "error": repr(e)})
+            self.animation_seen = request and request[0]
+            return
+        
+        if not state.display_enabled:
+            self.player.stop()
+        if request is None or request[0] == self.animation_seen:
+            return
+        
+        self.animation_seen, name, params = request
+        if state.display_enabled:
+            element = dict(params).get('team') or ('text' if name == 'transition' else 'timer')
+            try:
+                self.player.start(name, state.colors[element], params, self.clock())
+            except Exception as e:
+                # A request the frame function rejects is dropped, not retried
+                self.player.stop()
+                self.on_error("animation_failed", {"name": name, "error": repr(e)})
+
+    def _push_animation_frame(self):
+        """Show the animation frame due now; False once the animation is over"""
+        frame = self.player.frame(self.clock())
+        if frame is None:
+            return False
+        
+        with self.profiler.stage('animation'):
+            self.output = self.color_corrector.apply(frame)
+            self.double_buffer.SetImage(self.output)
+            self.double_buffer = self.matrix.SwapOnVSync(self.double_buffer)
+        if self.frame_buffer is not None:
+            self.frame_buffer.write(np.asarray(self.output))
+        
+        # Both canvases now hold animation frames, so the board is redrawn in full
+        self.canvas_keys = (None, None)
+        self.pushed_key = None
+        return True
+
+    def _draw_score(self, image, score, color, spec):
+        """Paste cached score digits at the positions precomputed for the zone"""
+        ones = score % 10
+        tens = score // 10
+        
+        self.glyph_cache.paste(image, ones, *spec.slots['ones'], color, spec.scale)
+        if tens == 1:
+            self.glyph_cache.paste(
+                image, GlyphCache.SMALL_ONE, *spec.slots['tens'], color, spec.scale
+            )
+
+    def _render_score_zone(self, zone):
+        """Render a team score into its zone"""
+        state = self.frame_state
+        team = zone.spec.team
+        if state.display_enabled:
+            self._draw_score(zone.image, state.scores[team], state.colors[team], zone.spec)
+
+    def _render_center_zone(self, zone):
+        """Render the timer, wall clock or message into the center zone"""
+        state = self.frame_state
+        if not state.display_enabled:
+            return
+        
+        if self.scroll_offset is not None:
+            self.scroll_strip.paste(zone.image, self.scroll_offset)
+        elif self.center_text:
+            if state.display_mode == 'timer':
+                minutes, seconds = divmod(int(self.frame_game_time), 60)
+                bitmap = self.minute_strings.get(minutes, seconds, state.colors['timer'])
+            else:
+                bitmap = self.atlas.render(self.center_text, state.colors['text'])
+            if bitmap:
+                bitmap.paste(
+                    zone.image,
+                    (zone.width - bitmap.width) // 2,
+                    (zone.height - bitmap.height) // 2
+                )
+
+    def draw_status_indicator(self, zone):
+        """Draw status bar: red on warning, amber when paused, green when running"""
+        state = self.frame_state
+        if state.two_min_warning:
+            color = (255, 0, 0)
+        elif not state.clock.running or self.frame_game_time <= 0:
+            color = (255, 128, 0)
+        else:
+            color = (0, 255, 0)
+        if not state.display_enabled:
+            color = tuple(c // 8 for c in color)
+        zone.image.paste(color, (0, 0, zone.width, zone.height))
+
+    def _zone_keys(self, state):
+        """Inputs each zone depends on; zones only re-render when these change"""
+        enabled = state.display_enabled
+        center_color = state.colors['text' if state.display_mode == 'text' else 'timer']
+        keys = {
+            'center': (
+                enabled, self.center_text, self.scroll_offset,
+                self.scroll_strip.version, center_color
+            ),
+            'status': (
+                enabled, state.two_min_warning, state.clock.running, self.frame_game_time <= 0
+            ),
+        }
+        for zone in self.zones.values():
+            team = zone.spec.team
+            if team is None:
+                yield zone, keys[zone.spec.content]
+            else:
+                yield zone, (enabled, state.scores[team], state.colors[team])
+
+    def next_frame_delay(self, state):
+        """Seconds until the picture next changes on its own, None if only on change"""
+        if self.player.active:
+            return self.player.next_delay(self.clock())
+        
+        if not state.display_enabled:
+            return None
+        
+        if state.display_mode == 'text':
+            if not state.show_time:
+                return self.scheduler.active_interval if state.scroll_text else None
+            now = datetime.now()
+            return 60 - now.second - now.microsecond / 1e6
+        
+        game_time = state.clock.remaining(self.clock())
+        if state.clock.running and game_time > 0:
+            # Wake just after the displayed second rolls over
+            return (game_time % 1 or 1.0) + 0.001
+        return None
+
+    def render_frame(self, state):
+        """Compose a snapshot into the frame and push it to the matrix
         
-        # Start display thread
+        Returns False when the frame matched the one already on the panel and
+        the upload and swap were skipped.
+        """
+        profiler = self.profiler
+        self._sync_output(state)
+        
+        # Animations replace the board until their last frame has played
+        self._check_animation(state)
+        if self.player.active and self._push_animation_frame():
+            return True
+        
+        # Everything below reads this one snapshot
+        self.frame_state = state
+        self.frame_game_time = state.clock.remaining(self.clock())
+        self.center_text = ''
+        self.scroll_offset = None
+        
+        if state.display_enabled:
+            if state.display_mode == 'timer':
+                # Draw timer
+                mins, secs = divmod(int(self.frame_game_time), 60)
+                self.center_text = f"{mins:02d}:{secs:02d}"
+            
+            elif state.display_mode == 'text':
+                if state.show_time:
+                    # Show current time
+                    self.center_text = datetime.now().strftime("%H:%M")
+                else:
+                    # Slide the viewport across the pre-rendered strip
+                    with profiler.stage('text'):
+                        if self.scroll_strip.update(state.scroll_text, state.colors['text']):
+                            self.scroll_position = 0
+                    if self.scroll_strip.period:
+                        self.scroll_position = (self.scroll_position + 1) % self.scroll_strip.period
+                        self.scroll_offset = self.scroll_position
+        
+        # Re-render only the zones whose inputs changed
+        for zone, key in self._zone_keys(state):
+            if zone.update(key, profiler):
+                with profiler.stage('compose'):
+                    self.frame.paste(zone.image, zone.box)
+        
+        # A tile's zone versions plus output settings identify its pixels exactly
+        output_key = (self.color_corrector.version, state.brightness)
+        frame_key = tuple(
+            tuple(self.zones[name].version for name in tile.zones) + output_key
+            for tile in self.layout.tiles
+        )
+        if frame_key == self.pushed_key:
+            return False
+        
+        with profiler.stage('color'):
+            self.output = self.color_corrector.apply(self.frame)
+        
+        # The back canvas still holds the frame from two swaps ago, so only
+        # tiles that changed since then are uploaded
+        back_key = self.canvas_keys[0]
+        with profiler.stage('set_image'):
+            for tile, key in zip(self.layout.tiles, frame_key):
+                if back_key is None or back_key[tile.index] != key:
+                    self.double_buffer.SetImage(self.output.crop(tile.crop), tile.x, tile.y)
+        with profiler.stage('swap'):
+            self.double_buffer = self.matrix.SwapOnVSync(self.double_buffer)
+        if self.frame_buffer is not None:
+            self.frame_buffer.write(np.asarray(self.output))
+        self.canvas_keys = (self.canvas_keys[1], frame_key)
+        self.pushed_key = frame_key
+        return True
+
+    def get_frame(self):
+        """Copy of the last frame pushed to the matrix"""
+        return np.array(self.output)
+
+    def cleanup(self):
+        """Blank the panels"""
+        self.matrix.Clear()
+
+def _state_property(name):
+    """Read-only ScoreBoard attribute backed by the current state snapshot"""
+    return property(lambda self: getattr(self.state.snapshot(), name))
+
+class ScoreBoard:
+    scores = _state_property('scores')
+    colors = _state_property('colors')
+    display_mode = _state_property('display_mode')
+    scroll_text = _state_property('scroll_text')
+    show_time = _state_property('show_time')
+    display_enabled = _state_property('display_enabled')
+    brightness = _state_property('brightness')
+    two_min_warning = _state_property('two_min_warning')
+
+    def __init__(self, start_display=True, recover=True):
+        # Initialize display options
+        self.options = dict(DISPLAY_CONFIG)
+        
+        # Game clock runs on its own; its readings are published in the state
+        self.timer = GameTimer(
+            warning_time=GAME_SETTINGS["warning_time"],
+            on_warning=self._on_two_min_warning
+        )
+        
+        # Pick the game up where it was after a crash or power loss
+        recovered = None
+        if recover:
+            start = time.perf_counter()
+            recovered = recover_game(
+                RECOVERY["snapshot_file"], logger, GAME_SETTINGS["warning_time"]
+            )
+        if recovered:
+            self.timer.pause()
+            self.timer.set(recovered["remaining"])
+
+        # Game and display state, published as immutable versioned snapshots
+        self.state = StateStore(BoardState(
+            version=0,
+            scores=freeze(recovered["scores"] if recovered else {"home": 0, "away": 0}),
+            clock=self.timer.state,
+            two_min_warning=recovered["two_min_warning"] if recovered else False,
+            display_mode='timer',
+            scroll_text="",
+            show_time=False,
+            display_enabled=True,
+            brightness=100,
+            colors=freeze({
+                'home': (0, 255, 0),
+                'away': (0, 255, 0),
+                'timer': (255, 255, 0),
+                'text': (0, 255, 255)
+            }),
+            animation=None
+        ))
+        
+        # Render in a child process, or on a thread in this one
         self.running = True
+        self.renderer = None
+        self.render_process = None
         self.display_thread = threading.Thread(target=self._update_display)
-        self.display_thread.start()
+        if RENDER_PROCESS["enabled"] and start_display:
+            self.render_process = RenderProcess(
+                self.options, MATRIX_BACKEND, self.state, **RENDER_PROCESS["supervisor"]
+            )
+        else:
+            self.renderer = FrameRenderer(self.options, MATRIX_BACKEND, clock=self.timer.clock)
+            # Every published change wakes the loop immediately
+            self.state.subscribe(lambda state: self.renderer.scheduler.wake())
+            if start_display:
+                self.display_thread.start()
         
         # Log initialization
         logger.log(LogType.SYSTEM, "scoreboard_init")
+        if recovered:
+            logger.log(
+                LogType.SYSTEM,
+                "game_state_recovered",
+                {**recovered, "seconds": round(time.perf_counter() - start, 3)}
+            )
+
+        self.snapshotter = None
+        if recover:
+            self.snapshotter = GameSnapshotter(
+                RECOVERY["snapshot_file"], self.state, self.timer.clock, logger,
+                RECOVERY["interval"]
+            )
+            self.snapshotter.start()
 
     def set_score(self, team, value, user=None):
         """Set score for specified team"""
-        if team in self.scores:
-            old_value = self.scores[team]
-            self.scores[team] = max(0, min(19, value))
-            logger.log(
-                LogType.GAME,
-                "score_update",
-                {
-                    "team": team,
-                    "old_value": old_value,
-                    "new_value": self.scores[team]
-                },
-                user
-            )
+        with self.state.lock:
+            scores = self.state.snapshot().scores
+            if team not in scores:
+                return
+            old_value = scores[team]
+            new_value = max(0, min(19, value))
+            changes = {'scores': freeze({**scores, team: new_value})}
+            if new_value > old_value:
+                # Published with the score, so the HTTP request never waits on it
+                changes['animation'] = self._animation_request('goal', {'team': team})
+            self.state.publish(**changes)
+        
+        logger.log(
+            LogType.GAME,
+            "score_update",
+            {
+                "team": team,
+                "old_value": old_value,
+                "new_value": new_value
+            },
+            user
+        )
+
+    @property
+    def game_time(self):
+        """Seconds remaining on the game clock"""
+        return self.state.snapshot().clock.remaining(self.timer.clock())
+
+    @property
+    def timer_paused(self):
+        return not self.state.snapshot().clock.running
 
     def set_game_time(self, minutes):
         """Set game timer"""
-        self.game_time = max(0, minutes * 60)
-        self.warning_triggered = False
+        with self.state.lock:
+            self.state.publish(clock=self.timer.set(max(0, minutes * 60)))
         logger.log(
             LogType.GAME,
             "timer_set",
@@ -202,35 +971,45 @@ class ScoreBoard:
         )
 
     def check_two_min_warning(self):
-        """Check for 2-minute warning condition"""
-        if not self.warning_triggered and self.game_time <= 120 and self.game_time > 119:
-            self.warning_triggered = True
-            self.timer_paused = True
-            self.two_min_warning = True
-            logger.log(LogType.GAME, "two_minute_warning")
-            return True
-        return False
+        """Fire the 2-minute warning if its deadline has passed"""
+        return self.timer.poll()
+
+    def _on_two_min_warning(self):
+        """Called by the timer when the clock reaches the warning deadline"""
+        with self.state.lock:
+            self.state.publish(clock=self.timer.state, two_min_warning=True)
+        logger.log(LogType.GAME, "two_minute_warning")
+
+    def pause_timer(self):
+        """Pause the game clock"""
+        with self.state.lock:
+            self.state.publish(clock=self.timer.pause())
+        logger.log(LogType.GAME, "timer_paused")
 
     def resume_timer(self):
         """Resume timer after warning"""
-        self.timer_paused = False
-        self.two_min_warning = False
+        with self.state.lock:
+            self.state.publish(clock=self.timer.resume(), two_min_warning=False)
         logger.log(LogType.GAME, "timer_resumed")
 
     def set_display_mode(self, mode):
         """Switch between timer and text display"""
         if mode in ['timer', 'text']:
-            self.display_mode = mode
+            self.state.publish(display_mode=mode)
             logger.log(
                 LogType.SYSTEM,
                 "display_mode_changed",
                 {"mode": mode}
             )
 
+    def set_show_time(self, show):
+        """Show the wall clock instead of the message in text mode"""
+        self.state.publish(show_time=bool(show))
+
     def set_brightness(self, level):
         """Set display brightness"""
-        self.brightness = max(10, min(100, level))
-        self.matrix.brightness = self.brightness
+        level = max(10, min(100, level))
+        self.state.publish(brightness=level)
         logger.log(
             LogType.SYSTEM,
             "brightness_changed",
@@ -239,80 +1018,106 @@ class ScoreBoard:
 
     def set_color(self, element, color):
         """Set RGB color for specific display element"""
-        if element in self.colors:
-            self.colors[element] = color
-            logger.log(
-                LogType.SYSTEM,
-                "color_changed",
-                {"element": element, "color": color}
-            )
+        with self.state.lock:
+            colors = self.state.snapshot().colors
+            if element not in colors:
+                return
+            self.state.publish(colors=freeze({**colors, element: tuple(color)}))
+        
+        logger.log(
+            LogType.SYSTEM,
+            "color_changed",
+            {"element": element, "color": color}
+        )
+
+    def set_scroll_text(self, text):
+        """Set the message scrolled in text mode"""
+        self.state.publish(scroll_text=text)
+
+    def _animation_request(self, name, params):
+        """State value asking the renderer to play an animation; call under state.lock"""
+        return (self.state.version + 1, name, tuple(sorted(params.items())))
+
+    def play_animation(self, name, **params):
+        """Play a precomputed animation, e.g. period_end or a sponsor transition"""
+        check_params(name, params)
+        with self.state.lock:
+            if 'team' in params and params['team'] not in self.state.snapshot().scores:
+                raise ValueError(f"Unknown team: {params['team']}")
+            self.state.publish(animation=self._animation_request(name, params))
+        logger.log(
+            LogType.SYSTEM,
+            "animation_played",
+            {"name": name, **params}
+        )
 
     def set_display_power(self, state):
         """Turn display on/off"""
-        self.display_enabled = state
+        self.state.publish(display_enabled=bool(state))
         logger.log(
             LogType.SYSTEM,
             "display_power",
             {"state": "on" if state else "off"}
         )
 
-    def draw_large_number(self, number, color=(255, 255, 255)):
-        """Create image with large digit for display"""
-        image = Image.new('RGB', (32, 64))
-        draw = ImageDraw.Draw(image)
-        
-        ones = number % 10
-        tens = number // 10
-        
-        self.large_digits.draw_digit(draw, ones, 0, 8, color, pixel_size=2)
-        if tens == 1:
-            self.large_digits.draw_small_one(draw, color)
-        
-        return image
+    def get_status(self, state=None):
+        """API view of one consistent state snapshot"""
+        state = state or self.state.snapshot()
+        clock = clock_status(state.clock, self.timer.clock())
+        return {
+            'version': state.version,
+            'scores': dict(state.scores),
+            'game_time': clock['remaining'],
+            'display_mode': state.display_mode,
+            'display_enabled': state.display_enabled,
+            'brightness': state.brightness,
+            'colors': {element: list(color) for element, color in state.colors.items()},
+            'scroll_text': state.scroll_text,
+            'show_time': state.show_time,
+            'timer_paused': not state.clock.running,
+            'two_min_warning': state.two_min_warning,
+            'clock': clock,
+        }
+
+    def get_display_stats(self):
+        """Frame rate, jitter and skip counters from whichever renderer is running"""
+        if self.render_process:
+            return self.render_process.get_stats()
+        return self.renderer.scheduler.get_stats()
+
+    def get_frame(self):
+        """Copy of the frame currently on the panels as an (h, w, 3) array"""
+        if self.render_process:
+            return self.render_process.get_frame()
+        return self.renderer.get_frame()
 
     def _update_display(self):
         """Main display update loop"""
-        scroll_position = 0
-        
+        scheduler = self.renderer.scheduler
         while self.running:
-            canvas = self.double_buffer
-            image = Image.new('RGB', (256, 32))
-            draw = ImageDraw.Draw(image)
-            
-            if self.display_enabled:
-                if self.display_mode == 'timer':
-                    # Draw timer
-                    if self.game_time > 0 and not self.timer_paused:
-                        self.game_time -= 0.1
-                        self.check_two_min_warning()
-                    
-                    mins, secs = divmod(self.game_time, 60)
-                    timer_text = f"{int(mins):02d}:{int(secs):02d}"
-                    # Draw timer implementation
-                
-                elif self.display_mode == 'text':
-                    if self.show_time:
-                        # Show current time
-                        time_text = datetime.now().strftime("%H:%M")
-                        # Draw time implementation
-                    else:
-                        # Scroll text
-                        # Scrolling text implementation
-                        scroll_position = (scroll_position + 1) % len(self.scroll_text)
-                
-                # Draw scores
-                # Score drawing implementation
-            
-            # Always draw status indicator
-            self.draw_status_indicator(image)
-            
-            canvas.SetImage(image)
-            canvas = self.matrix.SwapOnVSync(canvas)
-            
-            time.sleep(0.1)
+            state = self.state.snapshot()
+            scheduler.frame_started()
+            try:
+                pushed = self.renderer.render_frame(state)
+                delay = self.renderer.next_frame_delay(state)
+            except Exception as e:
+                # One bad frame must not take the board down for good
+                logger.log(LogType.ERROR, "render_frame_failed", {"error": repr(e)})
+                pushed = False
+                delay = None
+            scheduler.frame_finished(skipped=not pushed)
+            scheduler.wait(delay)
 
     def cleanup(self):
         """Clean up resources"""
         self.running = False
-        self.display_thread.join()
-        self.matrix.Clear()
+        if self.render_process:
+            self.render_process.stop()
+        else:
+            self.renderer.scheduler.wake()
+            if self.display_thread.is_alive():
+                self.display_thread.join()
+            self.renderer.cleanup()
+        self.timer.cleanup()
+        if self.snapshotter:
+            self.snapshotter.stop()
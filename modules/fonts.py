@@ -0,0 +1,147 @@
+# File: modules/fonts.py
+
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageFont
+
+
+def load_font(path=None, size=10):
+    """Load a TrueType or .pil bitmap font, or Pillow's default when path is None"""
+    if path is None:
+        return ImageFont.load_default()
+    if str(path).endswith(".pil"):
+        return ImageFont.load(path)
+    return ImageFont.truetype(path, size)
+
+
+def glyph_metrics(font, char):
+    """Ink box and advance of char; bitmap fonts before Pillow 9.2 only have getsize"""
+    if hasattr(font, "getbbox"):
+        return font.getbbox(char), font.getlength(char)
+    width, height = font.getsize(char)
+    return (0, 0, width, height), width
+
+
+class LRUCache:
+    """Dict with a size bound that drops the least recently used entry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return value
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class TextBitmap:
+    """Rendered string cropped to its ink box, with the mask to paste it through"""
+
+    __slots__ = ("image", "mask", "width", "height")
+
+    def __init__(self, image, mask):
+        self.image = image
+        self.mask = mask
+        self.width, self.height = mask.size
+
+    def paste(self, image, x, y):
+        """Draw the ink box with its top-left corner at (x, y)"""
+        image.paste(self.image, (x, y), self.mask)
+
+
+class FontAtlas:
+    """Glyphs of one font rasterized once, composed into strings by blitting"""
+
+    def __init__(self, font, max_glyphs=256, max_strings=64):
+        self.font = font
+        # char -> (mask, left, top, advance); mask is None for blank glyphs
+        self.masks = LRUCache(max_glyphs)
+        # (char, color) -> colored glyph image
+        self.glyphs = LRUCache(max_glyphs)
+        # (text, color) -> TextBitmap
+        self.strings = LRUCache(max_strings)
+
+    def _mask(self, char):
+        entry = self.masks.get(char)
+        if entry is None:
+            (left, top, right, bottom), advance = glyph_metrics(self.font, char)
+            mask = None
+            if right > left and bottom > top:
+                mask = Image.new("L", (right - left, bottom - top))
+                ImageDraw.Draw(mask).text((-left, -top), char, font=self.font, fill=255)
+            entry = self.masks.put(char, (mask, left, top, advance))
+        return entry
+
+    def _glyph(self, char, color, mask):
+        key = (char, color)
+        glyph = self.glyphs.get(key)
+        if glyph is None:
+            glyph = self.glyphs.put(key, Image.new("RGB", mask.size, color))
+        return glyph
+
+    def compose(self, text, color):
+        """Build a TextBitmap from cached glyphs without touching the string cache"""
+        color = tuple(color)
+        placed = []
+        cursor = 0.0
+        for char in text:
+            mask, left, top, advance = self._mask(char)
+            if mask is not None:
+                placed.append((char, mask, round(cursor) + left, top))
+            cursor += advance
+
+        if not placed:
+            return None
+
+        left = min(x for _, _, x, _ in placed)
+        top = min(y for _, _, _, y in placed)
+        right = max(x + mask.width for _, mask, x, _ in placed)
+        bottom = max(y + mask.height for _, mask, _, y in placed)
+        image = Image.new("RGB", (right - left, bottom - top))
+        ink = Image.new("L", image.size)
+        for char, mask, x, y in placed:
+            position = (x - left, y - top)
+            image.paste(self._glyph(char, color, mask), position, mask)
+            ink.paste(255, position + (position[0] + mask.width, position[1] + mask.height), mask)
+        return TextBitmap(image, ink)
+
+    def render(self, text, color):
+        """Cached TextBitmap for text in color; None when nothing is drawn"""
+        key = (text, tuple(color))
+        bitmap = self.strings.get(key)
+        if bitmap is None:
+            bitmap = self.strings.put(key, self.compose(text, color))
+        return bitmap
+
+
+class MinuteStrings:
+    """Rendered MM:SS strings for the minute currently on the game clock"""
+
+    def __init__(self, atlas):
+        self.atlas = atlas
+        self.key = None
+        self.strings = {}
+
+    def get(self, minutes, seconds, color):
+        key = (minutes, tuple(color))
+        if key != self.key:
+            # The clock moved to another minute; its strings are rarely shown again
+            self.key = key
+            self.strings = {}
+        bitmap = self.strings.get(seconds)
+        if bitmap is None:
+            bitmap = self.strings[seconds] = self.atlas.compose(
+                f"{minutes:02d}:{seconds:02d}", color
+            )
+        return bitmap
@@ -0,0 +1,103 @@
+# File: modules/layout.py
+
+from collections import namedtuple
+
+# Score blocks are drawn from 32px patterns: a 10px digit and a small "1" at x=24
+SCORE_BLOCK = 32
+SMALL_ONE_OFFSET = 24
+
+CONTENT_TYPES = ("score", "center", "status")
+
+# One placed zone; slots holds glyph positions relative to the zone
+LayoutZone = namedtuple(
+    "LayoutZone", "name content team x y width height scale slots tiles"
+)
+
+# One physical panel; crop is its PIL box, zones the names of zones it shows
+Tile = namedtuple("Tile", "index x y width height crop zones")
+
+
+def _resolve(value, size):
+    """Pixels for a layout value: int pixels, negative int from the far edge, float fraction"""
+    if isinstance(value, float):
+        return round(value * size)
+    if value < 0:
+        return size + value
+    return value
+
+
+class Layout:
+    """Zone and tile tables computed once from DISPLAY_CONFIG and a layout description"""
+
+    def __init__(self, display_config, description):
+        self.panel_width = display_config["cols"]
+        self.panel_height = display_config["rows"]
+        self.chain_length = display_config["chain_length"]
+        self.parallel = display_config["parallel"]
+        self.width = self.panel_width * self.chain_length
+        self.height = self.panel_height * self.parallel
+
+        zones = [self._place(name, spec) for name, spec in description.items()]
+        if sum(zone.content == "center" for zone in zones) != 1:
+            raise ValueError("Layout needs exactly one center zone")
+
+        self.tiles = self._build_tiles(zones)
+        self.zones = {
+            zone.name: zone._replace(
+                tiles=tuple(tile.index for tile in self.tiles if zone.name in tile.zones)
+            )
+            for zone in zones
+        }
+        self.center = next(zone for zone in zones if zone.content == "center").name
+
+    def _place(self, name, spec):
+        """Resolve one zone description to pixel coordinates"""
+        content = spec["content"]
+        if content not in CONTENT_TYPES:
+            raise ValueError(f"Unknown content for zone {name}: {content}")
+
+        x, y, width, height = spec["box"]
+        anchor_x, anchor_y = spec.get("anchor", (0.0, 0.0))
+        width = _resolve(width, self.width)
+        height = _resolve(height, self.height)
+        x = _resolve(x, self.width) - round(anchor_x * width)
+        y = _resolve(y, self.height) - round(anchor_y * height)
+        if width <= 0 or height <= 0 or x < 0 or y < 0 or x + width > self.width or y + height > self.height:
+            raise ValueError(f"Zone {name} ({x}, {y}, {width}x{height}) is outside the display")
+
+        scale = 1
+        slots = {}
+        if content == "score":
+            # Anything smaller would clip the tens digit and show 12 as 2
+            if min(width, height) < SCORE_BLOCK:
+                raise ValueError(
+                    f"Score zone {name} ({width}x{height}) is smaller than "
+                    f"{SCORE_BLOCK}x{SCORE_BLOCK}"
+                )
+            # Largest whole-pixel scale that fits, centered in the zone
+            scale = min(width, height) // SCORE_BLOCK
+            left = (width - SCORE_BLOCK * scale) // 2
+            top = (height - SCORE_BLOCK * scale) // 2
+            slots = {"ones": (left, top), "tens": (left + SMALL_ONE_OFFSET * scale, top)}
+
+        return LayoutZone(
+            name, content, spec.get("team"), x, y, width, height, scale, slots, ()
+        )
+
+    def _build_tiles(self, zones):
+        """One entry per panel, listing the zones that overlap it"""
+        tiles = []
+        for row in range(self.parallel):
+            for column in range(self.chain_length):
+                x = column * self.panel_width
+                y = row * self.panel_height
+                overlapping = tuple(
+                    zone.name for zone in zones
+                    if zone.x < x + self.panel_width and x < zone.x + zone.width
+                    and zone.y < y + self.panel_height and y < zone.y + zone.height
+                )
+                tiles.append(Tile(
+                    len(tiles), x, y, self.panel_width, self.panel_height,
+                    (x, y, x + self.panel_width, y + self.panel_height), overlapping
+                ))
+        return tuple(tiles)
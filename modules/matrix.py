@@ -0,0 +1,92 @@
+# File: modules/matrix.py
+
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+
+class VirtualCanvas:
+    """NumPy framebuffer with the FrameCanvas drawing surface used by ScoreBoard"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.buffer = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def SetImage(self, image, offset_x=0, offset_y=0, unsafe=True):
+        """Copy a PIL image into the buffer, clipped to the canvas"""
+        pixels = np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
+        height = min(pixels.shape[0], self.height - offset_y)
+        width = min(pixels.shape[1], self.width - offset_x)
+        if height > 0 and width > 0:
+            self.buffer[offset_y:offset_y + height, offset_x:offset_x + width] = pixels[:height, :width]
+
+    def SetPixel(self, x, y, red, green, blue):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.buffer[y, x] = (red, green, blue)
+
+    def Fill(self, red, green, blue):
+        self.buffer[:] = (red, green, blue)
+
+    def Clear(self):
+        self.buffer[:] = 0
+
+
+class VirtualMatrix:
+    """Headless stand-in for rgbmatrix.RGBMatrix that can capture every frame"""
+
+    def __init__(self, options, capture_dir=None, capture_format="png"):
+        self.width = options["cols"] * options["chain_length"]
+        self.height = options["rows"] * options["parallel"]
+        self.brightness = 100
+        self.front = VirtualCanvas(self.width, self.height)
+        self.frame_count = 0
+
+        # Frame capture
+        self.capture_dir = Path(capture_dir) if capture_dir else None
+        self.capture_format = capture_format
+        if self.capture_dir:
+            self.capture_dir.mkdir(parents=True, exist_ok=True)
+
+    def CreateFrameCanvas(self):
+        return VirtualCanvas(self.width, self.height)
+
+    def SwapOnVSync(self, canvas, framerate_fraction=1):
+        """Show canvas and hand back the previous front buffer for reuse"""
+        previous, self.front = self.front, canvas
+        self.frame_count += 1
+        if self.capture_dir:
+            self._capture(canvas.buffer)
+        return previous
+
+    def Clear(self):
+        self.front.Clear()
+
+    def get_frame(self):
+        """Copy of the frame currently on the virtual panel"""
+        return self.front.buffer.copy()
+
+    def _capture(self, buffer):
+        if self.capture_format == "raw":
+            # Concatenated rgb24 frames, e.g. ffmpeg -f rawvideo -pix_fmt rgb24 -s 256x32
+            with open(self.capture_dir / "frames.rgb", "ab") as f:
+                f.write(buffer.tobytes())
+        else:
+            Image.fromarray(buffer).save(self.capture_dir / f"frame_{self.frame_count:06d}.png")
+
+
+def create_matrix(options, backend="rgbmatrix", capture_dir=None, capture_format="png"):
+    """Create the matrix driver for the configured backend"""
+    if backend == "virtual":
+        return VirtualMatrix(options, capture_dir, capture_format)
+
+    if backend != "rgbmatrix":
+        raise ValueError(f"Unknown matrix backend: {backend}")
+
+    # Only importable on the Pi
+    from rgbmatrix import RGBMatrix, RGBMatrixOptions
+
+    matrix_options = RGBMatrixOptions()
+    for name, value in options.items():
+        setattr(matrix_options, name, value)
+    return RGBMatrix(options=matrix_options)
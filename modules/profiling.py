@@ -0,0 +1,46 @@
+# File: modules/profiling.py
+
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+import time
+
+_NULL_STAGE = nullcontext()
+
+
+class StageProfiler:
+    """Accumulates wall time per render stage; a no-op unless enabled"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def stage(self, name):
+        """Context manager timing one pass through a stage"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] += time.perf_counter() - start
+            self.counts[name] += 1
+
+    def get_stats(self, frames=None):
+        """Per-stage totals, plus the mean cost per frame when frames is given"""
+        stats = {}
+        for name, total in self.totals.items():
+            stats[name] = {
+                "total_ms": round(total * 1000, 3),
+                "calls": self.counts[name],
+            }
+            if frames:
+                stats[name]["us_per_frame"] = round(total / frames * 1e6, 3)
+        return stats
@@ -0,0 +1,183 @@
+# File: modules/recovery.py
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# Bumped when the snapshot layout changes; other versions are ignored
+SNAPSHOT_FORMAT = 2
+
+
+def write_snapshot(path, snapshot):
+    """Replace path with snapshot so a power cut leaves the old or new file, never half"""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    # Persist the rename itself
+    directory = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def read_snapshot(path):
+    """Last snapshot written to path, or None when missing or unreadable"""
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return snapshot
+
+
+def take_snapshot(state, now, log_id, wall=None):
+    """Compact game part of a BoardState, with the clock read at monotonic now
+
+    log_id is the last committed log id when state was read; every GAME event
+    up to it is already part of state.
+    """
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "ts": int((time.time() if wall is None else wall) * 1000),
+        "log_id": log_id,
+        "scores": dict(state.scores),
+        "remaining": round(state.clock.remaining(now), 3),
+        "running": state.clock.running,
+        "two_min_warning": state.two_min_warning,
+    }
+
+
+class GameReplay:
+    """Rebuilds game state from a snapshot by applying later GAME events in order"""
+
+    def __init__(self, snapshot, warning_time):
+        self.warning_time = warning_time
+        self.scores = dict(snapshot["scores"])
+        self.remaining = float(snapshot["remaining"])
+        self.running = snapshot["running"]
+        self.two_min_warning = snapshot["two_min_warning"]
+        self.warning_armed = self.remaining > warning_time
+        # Wall-clock milliseconds at which remaining was read; only used to run
+        # the clock forward, so a clock that stepped back just stops it advancing
+        self.at = snapshot["ts"]
+        self.events = 0
+
+    def advance(self, ts):
+        """Run the clock forward to ts, stopping at the two-minute warning"""
+        if self.running and ts > self.at:
+            remaining = max(0.0, self.remaining - (ts - self.at) / 1000)
+            if self.warning_armed and remaining <= self.warning_time:
+                remaining = float(self.warning_time)
+                self.running = False
+                self.warning_armed = False
+                self.two_min_warning = True
+            self.remaining = remaining
+        self.at = max(self.at, ts)
+
+    def apply(self, event, details, ts):
+        """Apply one logged GAME event; each is idempotent against the snapshot"""
+        self.advance(ts)
+        details = json.loads(details) if isinstance(details, str) else (details or {})
+
+        if event == "score_update" and details.get("team") in self.scores:
+            self.scores[details["team"]] = details["new_value"]
+        elif event == "timer_set":
+            self.remaining = max(0.0, float(details.get("minutes", 0)) * 60)
+            self.warning_armed = self.remaining > self.warning_time
+        elif event == "timer_paused":
+            self.running = False
+        elif event == "timer_resumed":
+            self.running = True
+            self.two_min_warning = False
+        elif event == "two_minute_warning":
+            self.remaining = float(self.warning_time)
+            self.running = False
+            self.warning_armed = False
+            self.two_min_warning = True
+        else:
+            return
+        self.events += 1
+
+
+def recover_game(path, logger, warning_time):
+    """Game state at the last snapshot plus the GAME events logged after it, or None
+
+    Rows past the snapshot are found by id, not timestamp: the Pi has no RTC
+    and often no NTP, so after a power cut its wall clock can restart behind
+    the last logged events. A clock that was running is restored paused at
+    its last known value, since the board cannot tell how much play went on
+    while it was dark.
+    """
+    snapshot = read_snapshot(path)
+    if snapshot is None:
+        return None
+
+    replay = GameReplay(snapshot, warning_time)
+    for row in logger.iter_after(snapshot["log_id"], log_types=["game"]):
+        replay.apply(row["event"], row["details"], row["ts"])
+
+    return {
+        "scores": replay.scores,
+        "remaining": round(replay.remaining, 3),
+        "was_running": replay.running,
+        "two_min_warning": replay.two_min_warning,
+        "snapshot_ts": snapshot["ts"],
+        "snapshot_log_id": snapshot["log_id"],
+        "replayed": replay.events,
+    }
+
+
+class GameSnapshotter:
+    """Writes a game snapshot every interval seconds while the game state changes"""
+
+    def __init__(self, path, state, clock, logger, interval=5.0):
+        self.path = path
+        self.state = state
+        self.clock = clock
+        self.logger = logger
+        self.interval = interval
+        self.last = None
+        self.written = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="game-snapshot", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def save(self):
+        """Write a snapshot now unless the game state is unchanged since the last one"""
+        # Id first: events are logged after they are published, so everything
+        # committed up to it is in the state read next
+        log_id = self.logger.last_id
+        snapshot = take_snapshot(self.state.snapshot(), self.clock(), log_id)
+        game = {key: value for key, value in snapshot.items() if key not in ("ts", "log_id")}
+        if game == self.last:
+            return False
+        write_snapshot(self.path, snapshot)
+        self.last = game
+        self.written += 1
+        return True
+
+    def stop(self):
+        """Write a final snapshot and stop the thread"""
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.save()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.save()
+            except OSError as e:
+                print(f"Snapshot error: {e}")
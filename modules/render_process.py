@@ -0,0 +1,236 @@
+# File: modules/render_process.py
+
+import multiprocessing
+from multiprocessing import shared_memory
+import queue
+import struct
+import threading
+import time
+import numpy as np
+from modules.logger import logger, LogType
+
+# Sequence counter in front of the pixels; odd while a frame is being written
+_HEADER = struct.Struct("Q")
+
+# Most errors passed up with one stats report; repeats are coalesced anyway
+_MAX_ERRORS = 20
+
+
+class SharedFrameBuffer:
+    """Last pushed frame in shared memory, guarded by a sequence lock"""
+
+    def __init__(self, width, height, name=None):
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=_HEADER.size + width * height * 3
+        )
+        self.name = self.shm.name
+        self.pixels = np.ndarray(
+            (height, width, 3), dtype=np.uint8, buffer=self.shm.buf, offset=_HEADER.size
+        )
+
+    def _sequence(self):
+        return _HEADER.unpack_from(self.shm.buf)[0]
+
+    def write(self, frame):
+        """Copy an (h, w, 3) frame in; only the render process writes"""
+        sequence = self._sequence()
+        _HEADER.pack_into(self.shm.buf, 0, sequence + 1)
+        self.pixels[:] = frame
+        _HEADER.pack_into(self.shm.buf, 0, sequence + 2)
+
+    def read(self):
+        """Copy of the last complete frame, retrying if a write overlapped"""
+        while True:
+            sequence = self._sequence()
+            if sequence % 2:
+                time.sleep(0)
+                continue
+            frame = self.pixels.copy()
+            if self._sequence() == sequence:
+                return frame
+
+    def reset(self):
+        """Make the sequence even again after a writer died mid-frame"""
+        sequence = self._sequence()
+        if sequence % 2:
+            _HEADER.pack_into(self.shm.buf, 0, sequence + 1)
+
+    def close(self):
+        """Detach, and free the segment if this side created it"""
+        # The segment can't close while a NumPy view still points into it
+        self.pixels = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _render_main(options, matrix_backend, frame_name, states, stats, stats_interval):
+    """Render process entry point: draw the newest snapshot, report stats, repeat"""
+    # Imported here so the parent never builds a renderer it won't use
+    from modules.display import FrameRenderer
+
+    frame_buffer = SharedFrameBuffer(
+        options["cols"] * options["chain_length"], options["rows"] * options["parallel"],
+        name=frame_name
+    )
+    # Errors go back to the parent with the stats and are logged there
+    errors = []
+    renderer = FrameRenderer(
+        options, matrix_backend, frame_buffer=frame_buffer,
+        on_error=lambda event, details: errors.append((event, details))
+    )
+    scheduler = renderer.scheduler
+    received = [states.get()]
+
+    def wait_for_state(timeout):
+        try:
+            received.append(states.get(timeout=max(0.0, timeout)))
+        except queue.Empty:
+            return False
+        return True
+
+    last_report = 0.0
+    try:
+        while True:
+            # Snapshots are complete, so only the newest one matters. Listeners
+            # run outside the store lock, so concurrent publishes can arrive out
+            # of order: go by version, not by arrival
+            while True:
+                try:
+                    received.append(states.get_nowait())
+                except queue.Empty:
+                    break
+            if any(state is None for state in received):
+                break
+            state = max(received, key=lambda state: state.version)
+            received.clear()
+
+            scheduler.frame_started()
+            try:
+                pushed = renderer.render_frame(state)
+                delay = renderer.next_frame_delay(state)
+            except Exception as e:
+                errors.append(("render_frame_failed", {"error": repr(e)}))
+                pushed = False
+                delay = None
+            scheduler.frame_finished(skipped=not pushed)
+
+            now = time.monotonic()
+            if now - last_report >= stats_interval:
+                stats.put({**scheduler.get_stats(), "errors": errors[-_MAX_ERRORS:]})
+                errors.clear()
+                last_report = now
+
+            received.append(state)
+            scheduler.wait(delay, waiter=wait_for_state)
+    finally:
+        renderer.cleanup()
+        frame_buffer.close()
+
+
+class RenderProcess:
+    """Runs FrameRenderer in a child process fed with state snapshots"""
+
+    def __init__(self, options, matrix_backend, store, restart_delay=1.0,
+                 stats_interval=1.0, hang_timeout=15.0):
+        self.options = options
+        self.matrix_backend = matrix_backend
+        self.store = store
+        self.restart_delay = restart_delay
+        self.stats_interval = stats_interval
+        self.hang_timeout = hang_timeout
+
+        # Spawn, not fork: the parent has Flask and timer threads running
+        self.context = multiprocessing.get_context("spawn")
+        self.frame_buffer = SharedFrameBuffer(
+            options["cols"] * options["chain_length"], options["rows"] * options["parallel"]
+        )
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.restarts = 0
+        self.running = True
+        self._start()
+
+        # Every published change goes straight to the renderer
+        store.subscribe(self._send)
+        self.supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self.supervisor.start()
+
+    def _start(self):
+        with self.lock:
+            # A killed renderer can leave a write half done, which would
+            # stall readers until the new one pushes its first frame
+            self.frame_buffer.reset()
+            self.states = self.context.Queue()
+            self.stats_queue = self.context.Queue()
+            self.process = self.context.Process(
+                target=_render_main,
+                args=(
+                    self.options, self.matrix_backend, self.frame_buffer.name,
+                    self.states, self.stats_queue, self.stats_interval
+                ),
+                daemon=True
+            )
+            self.process.start()
+            self.last_report = time.monotonic()
+            self.states.put(self.store.snapshot())
+
+    def _send(self, state):
+        with self.lock:
+            if self.running:
+                self.states.put_nowait(state)
+
+    def _supervise(self):
+        """Collect stats and restart the renderer if it dies or stops reporting"""
+        while self.running:
+            try:
+                stats = self.stats_queue.get(timeout=self.stats_interval)
+                for event, details in stats.pop("errors", ()):
+                    logger.log(LogType.ERROR, event, details)
+                self.stats = stats
+                self.last_report = time.monotonic()
+                continue
+            except queue.Empty:
+                pass
+
+            hung = time.monotonic() - self.last_report > self.hang_timeout
+            if not self.running or (self.process.is_alive() and not hung):
+                continue
+
+            logger.log(
+                LogType.ERROR,
+                "render_process_restarted",
+                {"exitcode": self.process.exitcode, "hung": hung}
+            )
+            self.process.kill()
+            self.process.join()
+            time.sleep(self.restart_delay)
+            if self.running:
+                self._start()
+                self.restarts += 1
+
+    def get_stats(self):
+        """Latest frame stats reported by the renderer, plus process health"""
+        return {
+            **self.stats,
+            "pid": self.process.pid,
+            "alive": self.process.is_alive(),
+            "restarts": self.restarts,
+        }
+
+    def get_frame(self):
+        """Copy of the frame currently on the panels"""
+        return self.frame_buffer.read()
+
+    def stop(self):
+        """Ask the renderer to exit, then free the shared frame"""
+        with self.lock:
+            self.running = False
+            self.states.put_nowait(None)
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.supervisor.join()
+        self.frame_buffer.close()
@@ -0,0 +1,76 @@
+# File: modules/scheduler.py
+
+from collections import deque
+import statistics
+import threading
+import time
+
+
+class FrameScheduler:
+    """Paces the display loop from what is on screen instead of a fixed 10 fps"""
+
+    def __init__(self, active_fps=30, idle_interval=5.0, stats_window=200, clock=time.monotonic):
+        self.active_interval = 1.0 / active_fps
+        self.idle_interval = idle_interval
+        self.clock = clock
+        self.wake_event = threading.Event()
+
+        # Rolling frame statistics
+        self.frame_starts = deque(maxlen=stats_window)
+        self.render_times = deque(maxlen=stats_window)
+        self.lateness = deque(maxlen=stats_window)
+        self.frames = 0
+        self.skipped = 0
+        self.wakeups = 0
+        self.current_start = None
+        self.target = None
+
+    def wake(self):
+        """Render the next frame immediately"""
+        self.wake_event.set()
+
+    def frame_started(self):
+        """Mark the start of a frame"""
+        # Clear before rendering so changes made mid-frame still wake the next wait
+        self.wake_event.clear()
+        now = self.clock()
+        if self.target is not None:
+            self.lateness.append(max(0.0, now - self.target))
+            self.target = None
+        self.frame_starts.append(now)
+        self.current_start = now
+        self.frames += 1
+
+    def frame_finished(self, skipped=False):
+        """Mark the end of a frame; skipped frames were identical and not pushed"""
+        self.render_times.append(self.clock() - self.current_start)
+        if skipped:
+            self.skipped += 1
+
+    def wait(self, delay, waiter=None):
+        """Sleep for delay seconds (None means until woken) or until wake() is called
+
+        waiter(timeout) replaces the wake event, e.g. to block on a state channel;
+        it must return True when woken early.
+        """
+        delay = self.idle_interval if delay is None else min(delay, self.idle_interval)
+        self.target = self.clock() + delay
+        if (waiter or self.wake_event.wait)(delay):
+            self.wakeups += 1
+            self.target = None
+
+    def get_stats(self):
+        """Achieved frame rate, render time and wake-up jitter"""
+        starts = list(self.frame_starts)
+        span = starts[-1] - starts[0] if len(starts) > 1 else 0
+        render_times = list(self.render_times)
+        lateness = list(self.lateness)
+
+        return {
+            "fps": round((len(starts) - 1) / span, 2) if span > 0 else 0.0,
+            "frame_ms": round(statistics.fmean(render_times) * 1000, 3) if render_times else 0.0,
+            "jitter_ms": round(statistics.pstdev(lateness) * 1000, 3) if len(lateness) > 1 else 0.0,
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "wakeups": self.wakeups,
+        }
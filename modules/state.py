@@ -0,0 +1,102 @@
+# File: modules/state.py
+
+import threading
+from types import MappingProxyType
+
+
+def freeze(mapping):
+    """Read-only copy of a dict for use inside a BoardState"""
+    return MappingProxyType(dict(mapping))
+
+
+class BoardState:
+    """Immutable, versioned snapshot of everything the renderer and API read"""
+
+    __slots__ = (
+        "version",
+        "scores",
+        "clock",
+        "two_min_warning",
+        "display_mode",
+        "scroll_text",
+        "show_time",
+        "display_enabled",
+        "brightness",
+        "colors",
+        "animation",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardState is immutable")
+
+    def __reduce__(self):
+        # Mapping proxies don't pickle; rebuild them from plain dicts
+        fields = self.as_dict()
+        fields["clock"] = self.clock
+        return (_restore_state, (fields,))
+
+    def replace(self, **changes):
+        """New snapshot with changes applied"""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return BoardState(**fields)
+
+    def as_dict(self):
+        """Plain-dict copy of the snapshot"""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields["scores"] = dict(self.scores)
+        fields["colors"] = {element: tuple(color) for element, color in self.colors.items()}
+        return fields
+
+
+def _restore_state(fields):
+    fields["scores"] = freeze(fields["scores"])
+    fields["colors"] = freeze(fields["colors"])
+    return BoardState(**fields)
+
+
+class StateStore:
+    """Holds the current BoardState; writers publish whole new snapshots"""
+
+    def __init__(self, initial):
+        # Reentrant so a writer can read, decide and publish under one lock
+        self.lock = threading.RLock()
+        self.current = initial
+        self.listeners = []
+        # Separate from lock so waiting readers never hold up writers
+        self.changed = threading.Condition()
+
+    def snapshot(self):
+        """Current state; a single reference read, so never torn"""
+        return self.current
+
+    @property
+    def version(self):
+        return self.current.version
+
+    def publish(self, **changes):
+        """Atomically replace the snapshot with changes and a bumped version"""
+        with self.lock:
+            state = self.current.replace(version=self.current.version + 1, **changes)
+            self.current = state
+
+        with self.changed:
+            self.changed.notify_all()
+        for listener in self.listeners:
+            listener(state)
+        return state
+
+    def wait(self, version, timeout=None):
+        """Block until a snapshot newer than version is published; None on timeout"""
+        with self.changed:
+            if self.changed.wait_for(lambda: self.current.version != version, timeout):
+                return self.current
+        return None
+
+    def subscribe(self, listener):
+        """Call listener(state) after every publish"""
+        self.listeners.append(listener)
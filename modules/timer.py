@@ -0,0 +1,160 @@
+# File: modules/timer.py
+
+import threading
+import time
+
+
+class ClockState:
+    """Immutable clock reading: remaining seconds at a monotonic anchor"""
+
+    __slots__ = ("remaining_at_anchor", "anchor", "warning_armed", "warning_time")
+
+    def __init__(self, remaining_at_anchor, anchor, warning_armed, warning_time):
+        object.__setattr__(self, "remaining_at_anchor", remaining_at_anchor)
+        object.__setattr__(self, "anchor", anchor)  # None while paused
+        object.__setattr__(self, "warning_armed", warning_armed)
+        object.__setattr__(self, "warning_time", warning_time)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ClockState is immutable")
+
+    def __reduce__(self):
+        return (ClockState, tuple(getattr(self, name) for name in self.__slots__))
+
+    def __eq__(self, other):
+        return isinstance(other, ClockState) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    @property
+    def running(self):
+        return self.anchor is not None
+
+    def warning_deadline(self):
+        """Monotonic timestamp at which the two-minute warning is due"""
+        if not self.warning_armed or self.anchor is None:
+            return None
+        return self.anchor + (self.remaining_at_anchor - self.warning_time)
+
+    def remaining(self, now):
+        """Seconds left on the clock at monotonic time now"""
+        if self.anchor is None:
+            return self.remaining_at_anchor
+
+        deadline = self.warning_deadline()
+        if deadline is not None and now >= deadline:
+            # Clock stops exactly at the warning, however late we look
+            return float(self.warning_time)
+        return max(0.0, self.remaining_at_anchor - (now - self.anchor))
+
+
+class GameTimer:
+    """Game clock computed from time.monotonic() anchors, independent of frame rate"""
+
+    def __init__(self, warning_time=120, on_warning=None, clock=time.monotonic, schedule=True):
+        self.warning_time = warning_time
+        self.on_warning = on_warning
+        self.clock = clock
+        self.schedule = schedule
+        self.lock = threading.RLock()
+        self.warning_timer = None
+        self.state = ClockState(0.0, clock(), False, warning_time)
+
+    @property
+    def running(self):
+        return self.state.running
+
+    def remaining(self, now=None):
+        """Seconds left on the clock at monotonic time now"""
+        return self.state.remaining(self.clock() if now is None else now)
+
+    def warning_deadline(self):
+        """Monotonic timestamp at which the two-minute warning is due"""
+        return self.state.warning_deadline()
+
+    def set(self, seconds):
+        """Load the clock with seconds, keeping the current run/pause state"""
+        with self.lock:
+            self._cancel_warning()
+            seconds = max(0.0, float(seconds))
+            anchor = None if self.state.anchor is None else self.clock()
+            self.state = ClockState(seconds, anchor, seconds > self.warning_time, self.warning_time)
+            self._schedule_warning()
+            return self.state
+
+    def pause(self):
+        """Freeze the clock at its current value"""
+        with self.lock:
+            if self.state.running:
+                self._cancel_warning()
+                self.state = ClockState(
+                    self.remaining(), None, self.state.warning_armed, self.warning_time
+                )
+            return self.state
+
+    def resume(self):
+        """Restart the clock from its frozen value"""
+        with self.lock:
+            if not self.state.running:
+                self.state = ClockState(
+                    self.state.remaining_at_anchor, self.clock(),
+                    self.state.warning_armed, self.warning_time
+                )
+                self._schedule_warning()
+            return self.state
+
+    def poll(self):
+        """Fire the warning if its deadline has passed; return True when fired"""
+        with self.lock:
+            deadline = self.warning_deadline()
+            if deadline is None or self.clock() < deadline:
+                return False
+
+            self.state = ClockState(float(self.warning_time), None, False, self.warning_time)
+            self._cancel_warning()
+
+        if self.on_warning:
+            self.on_warning()
+        return True
+
+    def get_status(self):
+        """Clock state for the API"""
+        return clock_status(self.state, self.clock())
+
+    def _schedule_warning(self):
+        deadline = self.warning_deadline()
+        if not self.schedule or deadline is None:
+            return
+        self.warning_timer = threading.Timer(max(0.0, deadline - self.clock()), self._on_deadline)
+        self.warning_timer.daemon = True
+        self.warning_timer.start()
+
+    def _on_deadline(self):
+        # Timer waits can return a hair early; re-arm rather than miss the warning
+        if not self.poll():
+            with self.lock:
+                if self.warning_timer is not None and threading.current_thread() is self.warning_timer:
+                    self._schedule_warning()
+
+    def _cancel_warning(self):
+        if self.warning_timer is not None:
+            self.warning_timer.cancel()
+            self.warning_timer = None
+
+    def cleanup(self):
+        """Cancel any pending warning deadline"""
+        with self.lock:
+            self._cancel_warning()
+
+
+def clock_status(state, now):
+    """API view of a ClockState at monotonic time now"""
+    deadline = state.warning_deadline()
+    return {
+        "remaining": round(state.remaining(now), 3),
+        "running": state.running,
+        "warning_in": None if deadline is None else round(max(0.0, deadline - now), 3),
+    }
@@ -1,12 +1,61 @@
 # File: modules/webserver.py
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, send_file
+from PIL import Image
+import io
+import json
+import time
 from datetime import datetime
 import threading
-from modules.logger import logger, LogType
+from modules.logger import logger, LogType, EXPORT_FORMATS, to_millis
+from configuration.settings import CONDITIONAL_GET, STATUS_STREAM
+
+def _sse(event, data, event_id):
+    """One server-sent event carrying data as compact JSON"""
+    payload = json.dumps(data, separators=(',', ':'))
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
 
 def create_app(scoreboard):
     app = Flask(__name__)
+
+    # Conditional GET: bodies are cached per ETag, so a match costs no reads or
+    # encoding. The boot token keeps tags from a previous run from matching.
+    boot = f"{int(time.time()):x}"
+    bodies = {}
+    readings = {}
+    readings_lock = threading.Lock()
+
+    def _conditional(key, tag, build):
+        """304 if the client holds tag, else the body for tag, built at most once"""
+        if tag is None:
+            return jsonify(build())
+
+        tag = f"{boot}-{tag}"
+        if request.if_none_match.contains(tag):
+            response = Response(status=304)
+        else:
+            cached = bodies.get(key)
+            if cached is None or cached[0] != tag:
+                if len(bodies) >= CONDITIONAL_GET['max_bodies']:
+                    bodies.clear()
+                cached = bodies[key] = (tag, jsonify(build()).get_data())
+            response = Response(cached[1], mimetype='application/json')
+        response.set_etag(tag)
+        # Stored, but revalidated on every use
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def _readings(period):
+        """Display, power and system readings, taken once per readings_ttl period"""
+        with readings_lock:
+            if readings.get('period') != period:
+                readings.update(
+                    period=period,
+                    display=scoreboard.get_display_stats(),
+                    power=power_manager.get_status(),
+                    system=system_info.get_status()
+                )
+            return {name: readings[name] for name in ('display', 'power', 'system')}
     
     @app.before_request
     def record_activity():
@@ -67,6 +116,15 @@ def create_app(scoreboard):
             logger.log(LogType.ERROR, "timer_resume_failed", {"error": str(e)})
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    @app.route('/api/timer/pause', methods=['POST'])
+    def pause_timer():
+        try:
+            scoreboard.pause_timer()
+            return jsonify({'status': 'success'})
+        except Exception as e:
+            logger.log(LogType.ERROR, "timer_pause_failed", {"error": str(e)})
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
     # Display Control
     @app.route('/api/display/mode', methods=['POST'])
     def set_display_mode():
@@ -101,17 +159,42 @@ def create_app(scoreboard):
             logger.log(LogType.ERROR, "brightness_change_failed", {"error": str(e)})
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    @app.route('/api/display/animation', methods=['POST'])
+    def play_animation():
+        try:
+            data = request.get_json()
+            name = data.pop('name', '')
+            scoreboard.play_animation(name, **data)
+            return jsonify({'status': 'success'})
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        except Exception as e:
+            logger.log(LogType.ERROR, "animation_failed", {"error": str(e)})
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
     @app.route('/api/display/text', methods=['POST'])
     def set_text():
         try:
             data = request.get_json()
             text = data.get('text', '')
-            scoreboard.scroll_text = text
+            scoreboard.set_scroll_text(text)
             return jsonify({'status': 'success'})
         except Exception as e:
             logger.log(LogType.ERROR, "text_update_failed", {"error": str(e)})
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    @app.route('/api/display/frame', methods=['GET'])
+    def get_frame():
+        try:
+            # Read from the renderer's shared frame, never from the matrix itself
+            png = io.BytesIO()
+            Image.fromarray(scoreboard.get_frame()).save(png, format='PNG')
+            png.seek(0)
+            return send_file(png, mimetype='image/png')
+        except Exception as e:
+            logger.log(LogType.ERROR, "frame_fetch_failed", {"error": str(e)})
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
     # Color Control
     @app.route('/api/colors', methods=['POST'])
     def set_colors():
@@ -128,22 +211,127 @@ def create_app(scoreboard):
     @app.route('/api/status', methods=['GET'])
     def get_status():
         try:
-            return jsonify({
-                'scores': scoreboard.scores,
-                'game_time': scoreboard.game_time,
-                'display_mode': scoreboard.display_mode,
-                'display_enabled': scoreboard.display_enabled,
-                'brightness': scoreboard.brightness,
-                'colors': scoreboard.colors,
-                'timer_paused': scoreboard.timer_paused,
-                'two_min_warning': scoreboard.two_min_warning,
-                'power': power_manager.get_status(),
-                'system': system_info.get_status()
-            })
+            # One snapshot, so scores, clock and display settings always agree
+            state = scoreboard.state.snapshot()
+            period = int(time.monotonic() // CONDITIONAL_GET['readings_ttl'])
+
+            def build():
+                status = scoreboard.get_status(state)
+                status.update(_readings(period))
+                return status
+
+            # A clock counting down changes the body on every call, so it gets no
+            # tag; one paused or run out to 0:00 only changes with the version
+            ticking = state.clock.running and state.clock.remaining(time.monotonic()) > 0
+            tag = None if ticking else f"{state.version}.{period}"
+            return _conditional('status', tag, build)
         except Exception as e:
             logger.log(LogType.ERROR, "status_fetch_failed", {"error": str(e)})
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    @app.route('/api/status/stream', methods=['GET'])
+    def stream_status():
+        """Server-sent events: the full board state, then only changed fields"""
+        def events():
+            # A reconnecting client always starts over from a full state
+            yield f"retry: {STATUS_STREAM['retry_ms']}\n\n"
+            state = scoreboard.state.snapshot()
+            sent = {}
+            kind = 'state'
+            while True:
+                status = scoreboard.get_status(state)
+                delta = {key: value for key, value in status.items() if sent.get(key) != value}
+                if delta:
+                    yield _sse(kind, delta, state.version)
+                sent, kind = status, 'delta'
+
+                changed = None
+                while changed is None:
+                    changed = scoreboard.state.wait(state.version, STATUS_STREAM['heartbeat'])
+                    if changed is None:
+                        # Keeps proxies open and surfaces dead clients on the write
+                        yield ": heartbeat\n\n"
+                state = changed
+
+        return Response(
+            events(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    # Logs
+    def _log_filters():
+        """Filters shared by the log list and export endpoints; ValueError on a bad date"""
+        types = request.args.get('types')
+        start = request.args.get('start')
+        end = request.args.get('end')
+        return {
+            'start_date': to_millis(start) if start else None,
+            'end_date': to_millis(end) if end else None,
+            'log_types': types.split(',') if types else None
+        }
+
+    @app.route('/api/logs', methods=['GET'])
+    def get_logs():
+        try:
+            limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+            search = request.args.get('search', '').strip()
+            if search:
+                return _conditional(request.full_path, logger.version, lambda: logger.search_logs(
+                    search,
+                    limit=limit,
+                    cursor=request.args.get('cursor'),
+                    order=request.args.get('order', 'newest'),
+                    **_log_filters()
+                ))
+            return _conditional(request.full_path, logger.version, lambda: logger.get_log_page(
+                limit=limit, cursor=request.args.get('cursor'), **_log_filters()
+            ))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        except Exception as e:
+            logger.log(LogType.ERROR, "log_fetch_failed", {"error": str(e)})
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
+    @app.route('/api/logs/export', methods=['GET'])
+    def export_logs():
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'status': 'error', 'message': f"Unknown format: {fmt}"}), 400
+        # Parsed now, since once the stream has started it can only be cut off
+        try:
+            filters = _log_filters()
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        # Rows go from the database cursor to the socket a batch at a time
+        return Response(
+            logger.export(fmt, **filters),
+            mimetype=EXPORT_FORMATS[fmt],
+            headers={'Content-Disposition': f'attachment; filename=scoreboard-logs.{fmt}'}
+        )
+
+    @app.route('/api/logs/rollups', methods=['GET'])
+    def get_log_rollups():
+        try:
+            span = request.args.get('span', 'hour')
+            events = request.args.get('events')
+            return _conditional(request.full_path, logger.version, lambda: logger.get_rollups(
+                span, events=events.split(',') if events else None, **_log_filters()
+            ))
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        except Exception as e:
+            logger.log(LogType.ERROR, "log_rollups_fetch_failed", {"error": str(e)})
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
+    @app.route('/api/logs/stats', methods=['GET'])
+    def get_log_stats():
+        try:
+            return jsonify(logger.get_db_stats())
+        except Exception as e:
+            logger.log(LogType.ERROR, "log_stats_fetch_failed", {"error": str(e)})
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+
     # System Updates
     @app.route('/api/update/system', methods=['POST'])
     def update_system():
@@ -0,0 +1,450 @@
+# File: scripts/benchmark.py
+
+"""Micro-benchmarks for the scoreboard hot paths.
+
+Run from the project root, e.g. ``python scripts/benchmark.py glyphs``.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Benchmarks always render into the headless backend
+os.environ["MATRIX_BACKEND"] = "virtual"
+
+from configuration.settings import GAME_SETTINGS, DISPLAY_CONFIG
+from modules.timer import GameTimer
+
+
+def _report(name, seconds, iterations):
+    per_call = seconds / iterations * 1e6
+    print(f"{name:<28} {per_call:10.1f} us/frame")
+    return per_call
+
+
+def bench_glyphs(args):
+    """Compare per-cell rectangle drawing against cached glyph pastes"""
+    from PIL import Image, ImageDraw
+    from modules.display import GlyphCache, LargeDigits
+
+    digits = LargeDigits()
+    cache = GlyphCache(digits)
+    color = (0, 255, 0)
+    iterations = args.iterations
+
+    def old_path(score):
+        image = Image.new('RGB', (256, 32))
+        draw = ImageDraw.Draw(image)
+        for x_offset in (0, 224):
+            digits.draw_digit(draw, score % 10, x_offset, 0, color, pixel_size=1)
+            if score >= 10:
+                digits.draw_small_one(draw, color, x_offset + 24, 0)
+        return image
+
+    def new_path(score):
+        image = Image.new('RGB', (256, 32))
+        for x_offset in (0, 224):
+            cache.paste(image, score % 10, x_offset, 0, color, pixel_size=1)
+            if score >= 10:
+                cache.paste(image, GlyphCache.SMALL_ONE, x_offset + 24, 0, color, pixel_size=1)
+        return image
+
+    # Every score the board can show, 0 to max_score
+    scores = range(GAME_SETTINGS["max_score"] + 1)
+    for score in scores:
+        if old_path(score).tobytes() != new_path(score).tobytes():
+            raise SystemExit(f"glyph cache output differs from per-cell drawing for {score}")
+
+    frames = iterations * len(scores)
+    old = _report(
+        "per-cell rectangles",
+        timeit.timeit(lambda: [old_path(score) for score in scores], number=iterations),
+        frames,
+    )
+    new = _report(
+        "cached glyph paste",
+        timeit.timeit(lambda: [new_path(score) for score in scores], number=iterations),
+        frames,
+    )
+    print(f"{'speedup':<28} {old / new:10.1f}x")
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def bench_timer(args):
+    """Simulate a full period under render latency and check the clock for drift"""
+    clock = FakeClock()
+    timer = GameTimer(
+        warning_time=GAME_SETTINGS["warning_time"], clock=clock, schedule=False
+    )
+    period = GAME_SETTINGS["default_period_length"] * 60
+    timer.set(period)
+
+    rng = random.Random(2024)
+    paused_for = 0.0
+    legacy_time = period
+    max_drift = 0.0
+    frames = 0
+
+    while timer.remaining() > 0:
+        # 100 ms sleep plus render, SetImage and swap latency
+        clock.now += 0.1 + rng.uniform(0.0, 0.08)
+        frames += 1
+        legacy_time = max(0.0, legacy_time - 0.1)
+
+        if timer.poll():
+            warning_at = period - GAME_SETTINGS["warning_time"]
+            if timer.remaining() != GAME_SETTINGS["warning_time"]:
+                raise SystemExit("clock did not stop exactly at the warning")
+            paused_for = clock.now - warning_at
+            timer.resume()
+
+        expected = max(0.0, period - (clock.now - paused_for))
+        max_drift = max(max_drift, abs(timer.remaining() - expected))
+
+    print(f"{'frames rendered':<28} {frames:10d}")
+    print(f"{'max monotonic drift':<28} {max_drift:10.6f} s")
+    print(f"{'legacy tick clock left':<28} {legacy_time:10.1f} s")
+    if max_drift > 1e-6:
+        raise SystemExit("game clock drifted")
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def _drive_timer(scoreboard, clock, frame):
+    clock.now += 0.1
+    if frame % 300 == 299:
+        # Walk both teams through every score the board can show
+        step = frame // 300
+        scoreboard.set_score("home", step % (GAME_SETTINGS["max_score"] + 1))
+        scoreboard.set_score("away", (step * 7) % (GAME_SETTINGS["max_score"] + 1))
+
+
+def _drive_text(scoreboard, clock, frame):
+    if frame % 1000 == 0:
+        scoreboard.set_scroll_text(f"Welcome to the rink - message {frame // 1000}")
+
+
+def bench_render(args):
+    """Drive ScoreBoard through each display mode and time every render stage"""
+    from modules.display import ScoreBoard
+    from modules.logger import LoggerDB, logger
+
+    # ScoreBoard logs as it goes; keep that out of the checkout's database
+    tmp = tempfile.TemporaryDirectory()
+    logger.use(LoggerDB(str(Path(tmp.name) / "render.db")))
+
+    # Panel geometry is read when the renderer builds its layout
+    DISPLAY_CONFIG.update(chain_length=args.chain, parallel=args.parallel)
+
+    modes = {
+        "timer": ({"display_mode": "timer"}, _drive_timer),
+        "text": ({"display_mode": "text", "show_time": False}, _drive_text),
+        "clock": ({"display_mode": "text", "show_time": True}, None),
+        "off": ({"display_power": False}, _drive_timer),
+        "dimmed": ({"display_mode": "timer", "brightness": 40}, _drive_timer),
+    }
+    results = {
+        "revision": _git_revision(),
+        "frames": args.iterations,
+        "geometry": {"chain_length": args.chain, "parallel": args.parallel},
+        "modes": {},
+    }
+
+    for mode, (state, drive) in modes.items():
+        clock = FakeClock()
+        scoreboard = ScoreBoard(start_display=False, recover=False)
+        scoreboard.timer.clock = clock
+        scoreboard.renderer.clock = clock
+        scoreboard.set_game_time(GAME_SETTINGS["default_period_length"])
+        scoreboard.set_scroll_text("Welcome to the rink")
+        for name, value in state.items():
+            getattr(scoreboard, f"set_{name}")(value)
+
+        renderer = scoreboard.renderer
+        renderer.profiler.enabled = True
+        skipped = 0
+        start = time.perf_counter()
+        for frame in range(args.iterations):
+            if drive:
+                drive(scoreboard, clock, frame)
+            if not renderer.render_frame(scoreboard.state.snapshot()):
+                skipped += 1
+        elapsed = time.perf_counter() - start
+        scoreboard.cleanup()
+
+        results["modes"][mode] = {
+            "fps": round(args.iterations / elapsed, 1),
+            "us_per_frame": round(elapsed / args.iterations * 1e6, 3),
+            "skipped": skipped,
+            "stages": renderer.profiler.get_stats(args.iterations),
+        }
+    logger.close()
+    tmp.cleanup()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+    for mode, result in results["modes"].items():
+        print(
+            f"{mode:<10} {result['fps']:10.1f} fps {result['us_per_frame']:10.1f} us/frame"
+            f" {result['skipped']:6d} skipped"
+        )
+        for stage, stats in sorted(result["stages"].items()):
+            print(f"  {stage:<26} {stats['us_per_frame']:10.1f} us/frame")
+
+
+# Log schema and insert from before the batched writer and schema version 1
+LEGACY_SCHEMA = """
+    CREATE TABLE logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME NOT NULL,
+        log_type TEXT NOT NULL,
+        event TEXT NOT NULL,
+        details TEXT,
+        user TEXT
+    );
+    CREATE INDEX idx_timestamp ON logs(timestamp);
+    CREATE INDEX idx_type ON logs(log_type);
+"""
+LEGACY_INSERT = "INSERT INTO logs (timestamp, log_type, event, details, user) VALUES (?, ?, ?, ?, ?)"
+
+
+def bench_logger(args):
+    """Compare one connection and commit per entry against the batched writer,
+    and count the rows coalescing leaves for repetitive events"""
+    from modules.logger import LoggerDB, LogType
+
+    iterations = args.iterations
+    details = {"team": "home", "old_value": 1, "new_value": 2}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = Path(tmp) / "old.db"
+        with sqlite3.connect(old_path) as conn:
+            conn.executescript(LEGACY_SCHEMA)
+
+        def old_log():
+            conn = sqlite3.connect(old_path)
+            with conn:
+                conn.execute(
+                    LEGACY_INSERT,
+                    (datetime.utcnow().isoformat(), "game", "score_update", json.dumps(details), None),
+                )
+            conn.close()
+
+        old = timeit.timeit(old_log, number=iterations)
+
+        # Queue sized to hold the whole run so nothing is dropped
+        db = LoggerDB(str(Path(tmp) / "new.db"), queue_size=iterations)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            db.log(LogType.GAME, "score_update", details)
+        enqueued = time.perf_counter() - start
+        db.flush()
+        committed = time.perf_counter() - start
+        db.close()
+
+        with sqlite3.connect(db.db_path) as conn:
+            rows = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        if rows != iterations:
+            raise SystemExit(f"batched writer stored {rows} of {iterations} entries")
+
+        # Status polls and a sustained low voltage, as coalesced in production
+        from configuration.settings import LOG_COALESCE
+
+        db = LoggerDB(str(Path(tmp) / "coalesced.db"), queue_size=iterations, coalesce=LOG_COALESCE)
+        for i in range(iterations):
+            db.log(LogType.NETWORK, "http_request", {"method": "GET", "path": "/api/status", "status": 200})
+            if i % 10 == 0:
+                db.log(LogType.POWER, "low_voltage_warning", {"voltage": 4.5 + i % 3 / 10})
+        db.close()
+        with sqlite3.connect(db.db_path) as conn:
+            coalesced = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        logged = iterations + (iterations + 9) // 10
+
+    print(f"{'per-entry commit':<28} {iterations / old:10.0f} inserts/s {old / iterations * 1e6:10.1f} us/log")
+    print(f"{'batched writer':<28} {iterations / committed:10.0f} inserts/s {enqueued / iterations * 1e6:10.1f} us/log")
+    print(f"{'speedup':<28} {old / committed:10.1f}x")
+    print(f"{'coalesced rows':<28} {coalesced:10d} for {logged} entries")
+
+
+def _fill_legacy_logs(path, rows):
+    """Version 0 log database with rows entries, one a second up to now"""
+    types = ["game", "system", "error", "power", "network"]
+    events = ["http_request", "score_update", "timer_set", "low_voltage"]
+    start = datetime.utcnow().timestamp() - rows
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executescript(LEGACY_SCHEMA)
+        conn.executemany(LEGACY_INSERT, (
+            (
+                datetime.utcfromtimestamp(start + i).isoformat(),
+                types[i % len(types)],
+                events[i % len(events)],
+                json.dumps({"method": "GET", "path": "/api/status", "status": 200}),
+                None,
+            )
+            for i in range(rows)
+        ))
+    conn.close()
+
+
+def _query_plan(conn, query, params):
+    return "; ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params))
+
+
+def bench_logs(args):
+    """Migrate a version 0 log database, then compare query plans, pages, search,
+    buffer and exports"""
+    from configuration.settings import LOG_BUFFER_SIZE
+    from modules.logger import LoggerDB
+
+    rows = args.iterations
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "legacy.db"
+        _fill_legacy_logs(legacy, rows)
+        shutil.copy(legacy, Path(tmp) / "logs.db")
+
+        start = time.perf_counter()
+        db = LoggerDB(str(Path(tmp) / "logs.db"), buffer_size=0)
+        migrated = time.perf_counter() - start
+        db.close()
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute("VACUUM")
+        print(f"{'migration':<28} {migrated:10.2f} s for {rows} rows")
+        print(
+            f"{'file size':<28} {legacy.stat().st_size / 1e6:10.1f} MB -> "
+            f"{Path(db.db_path).stat().st_size / 1e6:.1f} MB"
+        )
+
+        # The log viewer's query: two types over the latest tenth of the range, newest first
+        end_date = datetime.utcnow().isoformat()
+        start_date = (datetime.utcnow() - timedelta(seconds=rows // 10)).isoformat()
+        log_types = ["game", "error"]
+        legacy_query = (
+            "SELECT * FROM logs WHERE timestamp >= ? AND timestamp <= ?"
+            " AND log_type IN (?, ?) ORDER BY timestamp DESC LIMIT 100"
+        )
+        legacy_params = [start_date, end_date] + log_types
+
+        with sqlite3.connect(legacy) as conn:
+            print(f"{'legacy plan':<28} {_query_plan(conn, legacy_query, legacy_params)}")
+            legacy_time = timeit.timeit(
+                lambda: conn.execute(legacy_query, legacy_params).fetchall(), number=20
+            ) / 20
+        with sqlite3.connect(db.db_path) as conn:
+            for log_type in log_types:
+                query, params = db._query(start_date, end_date, log_type, 100, None, True)
+                print(f"{'v1 plan (' + log_type + ')':<28} {_query_plan(conn, query, params)}")
+        new_time = timeit.timeit(
+            lambda: db.get_logs(start_date, end_date, log_types, 100), number=20
+        ) / 20
+        print(f"{'legacy query':<28} {legacy_time * 1e3:10.2f} ms")
+        print(f"{'v1 query':<28} {new_time * 1e3:10.2f} ms")
+
+        # Full-text search for a quarter of the rows and for every row
+        for text in ("score update", "api status"):
+            for order in ("rank", "newest"):
+                elapsed = timeit.timeit(
+                    lambda: db.search_logs(text, limit=100, order=order), number=5
+                ) / 5
+                print(f"{'search ' + repr(text) + ' ' + order:<28} {elapsed * 1e3:10.2f} ms")
+
+        for label, types in (("all types", None), ("game only", ["game"])):
+            cursor = None
+            times = []
+            while True:
+                start = time.perf_counter()
+                page = db.get_log_page(log_types=types, limit=100, cursor=cursor)
+                times.append(time.perf_counter() - start)
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            print(f"{label + ' first page':<28} {times[0] * 1e6:10.1f} us")
+            print(f"{label + ' last page':<28} {times[-1] * 1e6:10.1f} us ({len(times)} pages)")
+
+        # The same latest pages served from the in-memory buffer
+        tracemalloc.start()
+        buffered = LoggerDB(db.db_path, buffer_size=LOG_BUFFER_SIZE)
+        footprint = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        buffered.close()
+        entries = buffered.buffer.get_stats()["entries"]
+        print(
+            f"{'buffer memory':<28} {footprint / 1e6:10.2f} MB for {entries} entries "
+            f"({footprint / max(entries, 1):.0f} B each)"
+        )
+        for label, types in (("all types", None), ("game only", ["game"])):
+            for name, source in (("sqlite", db), ("buffer", buffered)):
+                elapsed = timeit.timeit(
+                    lambda: source.get_logs(log_types=types, limit=100), number=100
+                ) / 100
+                print(f"{label + ' latest ' + name:<28} {elapsed * 1e6:10.1f} us")
+
+        for fmt in ("ndjson", "csv"):
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = sum(len(chunk) for chunk in db.export(fmt))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(
+                f"{fmt + ' export':<28} {rows / elapsed:10.0f} rows/s "
+                f"{size / 1e6:8.1f} MB out {peak / 1e6:8.2f} MB peak"
+            )
+
+
+BENCHMARKS = {
+    "glyphs": bench_glyphs,
+    "logger": bench_logger,
+    "logs": bench_logs,
+    "render": bench_render,
+    "timer": bench_timer,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    parser.add_argument("--chain", type=int, default=DISPLAY_CONFIG["chain_length"],
+                        help="panels per chain for the render benchmark")
+    parser.add_argument("--parallel", type=int, default=DISPLAY_CONFIG["parallel"],
+                        help="parallel chains for the render benchmark")
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# File: tests/test_timer.py
+
+import random
+
+import pytest
+
+from configuration.settings import GAME_SETTINGS
+from modules.timer import GameTimer, clock_status
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_timer(clock, warnings=None, warning_time=120):
+    on_warning = None if warnings is None else (lambda: warnings.append(clock()))
+    return GameTimer(warning_time, on_warning=on_warning, clock=clock, schedule=False)
+
+
+def test_no_drift_under_frame_latency(clock):
+    warnings = []
+    warning_time = GAME_SETTINGS["warning_time"]
+    timer = make_timer(clock, warnings, warning_time)
+    period = GAME_SETTINGS["default_period_length"] * 60
+    start = clock()
+    timer.set(period)
+
+    # A full period of frames arriving late and unevenly; the clock must follow
+    # elapsed time, not frames, and stop for the warning until resumed
+    rng = random.Random(7)
+    paused_for = 0.0
+    max_drift = 0.0
+    while timer.remaining() > 0:
+        clock.advance(0.1 + rng.choice((0.0, 1 / 60, 0.05, 0.08, 1.3)))
+        if timer.poll():
+            assert timer.remaining() == float(warning_time)
+            paused_for = clock() - (start + period - warning_time)
+            timer.resume()
+        expected = max(0.0, period - (clock() - start - paused_for))
+        max_drift = max(max_drift, abs(timer.remaining() - expected))
+
+    # Fired once, by the first poll past the deadline
+    assert len(warnings) == 1 and warnings[0] >= start + period - warning_time
+    assert paused_for > 0
+    assert max_drift < 1e-6
+
+
+def test_runs_down_to_zero_and_stops_there(clock):
+    timer = make_timer(clock, warning_time=0)
+    timer.set(10)
+    clock.advance(25)
+    assert timer.remaining() == 0.0
+
+
+def test_warning_fires_exactly_at_deadline(clock):
+    warnings = []
+    timer = make_timer(clock, warnings)
+    start = clock()
+    timer.set(600)
+
+    assert timer.warning_deadline() == start + 480
+    clock.advance(479.999)
+    assert not timer.poll()
+    assert timer.remaining() > 120
+
+    clock.advance(0.001)
+    assert timer.poll()
+    assert warnings == [start + 480]
+    assert not timer.running
+    assert timer.remaining() == 120.0
+
+    # Fired once only, and the clock stays frozen
+    clock.advance(30)
+    assert not timer.poll()
+    assert warnings == [start + 480]
+    assert timer.remaining() == 120.0
+
+
+def test_late_poll_still_stops_at_warning(clock):
+    warnings = []
+    timer = make_timer(clock, warnings)
+    timer.set(600)
+
+    clock.advance(500)
+    # Clamped even before anyone polls
+    assert timer.remaining() == 120.0
+    assert timer.poll()
+    assert len(warnings) == 1
+    assert timer.remaining() == 120.0
+
+
+def test_pause_freezes_and_resume_continues(clock):
+    timer = make_timer(clock)
+    timer.set(600)
+
+    clock.advance(100)
+    timer.pause()
+    assert not timer.running
+    assert timer.warning_deadline() is None
+
+    clock.advance(50)
+    assert timer.remaining() == 500.0
+
+    timer.resume()
+    assert timer.running
+    # The pause moves the deadline back by its length
+    assert timer.warning_deadline() == clock() + 380
+
+    clock.advance(30)
+    assert timer.remaining() == 470.0
+
+
+def test_pause_and_resume_are_idempotent(clock):
+    timer = make_timer(clock)
+    timer.set(600)
+    clock.advance(10)
+
+    paused = timer.pause()
+    clock.advance(10)
+    assert timer.pause() is paused
+
+    resumed = timer.resume()
+    clock.advance(10)
+    assert timer.resume() is resumed
+    assert timer.remaining() == 580.0
+
+
+def test_set_keeps_run_state_and_rearms_warning(clock):
+    warnings = []
+    timer = make_timer(clock, warnings)
+    timer.set(600)
+    clock.advance(500)
+    assert timer.poll()
+
+    # Paused by the warning, so a new period loads paused with the warning armed
+    timer.set(300)
+    assert not timer.running
+    assert timer.remaining() == 300.0
+    timer.resume()
+    assert timer.warning_deadline() == clock() + 180
+
+    # Loading less than the warning time disarms it
+    timer.set(90)
+    assert timer.warning_deadline() is None
+    clock.advance(200)
+    assert not timer.poll()
+    assert timer.remaining() == 0.0
+    assert len(warnings) == 1
+
+
+def test_clock_status(clock):
+    timer = make_timer(clock)
+    timer.set(600)
+    clock.advance(80.5)
+    assert clock_status(timer.state, clock()) == {
+        "remaining": 519.5,
+        "running": True,
+        "warning_in": 399.5,
+    }